@@ -0,0 +1,318 @@
+import datetime
+import threading
+from typing import Any, Callable, Iterable
+from api_library.library import Library
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.book.book_type import BookType
+from api_library.loan import Loan
+from api_library.exceptions import LibraryException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Day numbers are proleptic Gregorian ordinals, numpy counts datetime64 days from 1970-01-01.
+_EPOCH_ORDINAL: int = datetime.date(1970, 1, 1).toordinal()
+
+def _to_day(value: datetime.date) -> int:
+    return value.toordinal()
+
+def _split_days(days: "numpy.ndarray") -> tuple["numpy.ndarray", "numpy.ndarray"]:
+    # Year and month * 100 + day of every day number, enough to compare dates within a year.
+    temp_dates = (days - _EPOCH_ORDINAL).astype("datetime64[D]")
+    temp_months = temp_dates.astype("datetime64[M]")
+    years = temp_dates.astype("datetime64[Y]").astype(numpy.int64) + 1970
+    month_days = (temp_months.astype(numpy.int64) % 12 + 1) * 100 + \
+        (temp_dates - temp_months).astype(numpy.int64) + 1
+
+    return years, month_days
+
+class _ColumnTable:
+    INITIAL_CAPACITY: int = 1024
+
+    def __init__(self, dtypes: dict[str, str]) -> None:
+        # The first column holds the record id the rows are looked up by.
+        self.__dtypes: dict[str, str] = dtypes
+        self.__rows: dict[int, int] = dict()
+        self.__size: int = 0
+        self.__capacity: int = 0
+        self.__columns: dict[str, numpy.ndarray] = dict()
+        self.__valid: numpy.ndarray = numpy.zeros(0, dtype=bool)
+        self.load(())
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        temp_rows: list[tuple] = list(rows)
+        temp_values: list[tuple] = list(zip(*temp_rows)) or [() for _ in self.__dtypes]
+
+        self.__size = len(temp_rows)
+        self.__capacity = max(self.INITIAL_CAPACITY, self.__size * 2)
+        self.__columns = dict()
+
+        for (name, dtype), values in zip(self.__dtypes.items(), temp_values):
+            column: numpy.ndarray = numpy.zeros(self.__capacity, dtype=dtype)
+            column[:self.__size] = values
+            self.__columns[name] = column
+
+        self.__valid = numpy.zeros(self.__capacity, dtype=bool)
+        self.__valid[:self.__size] = True
+        self.__rows = {row[0]: index for index, row in enumerate(temp_rows)}
+
+    def get_value(self, record_id: int, name: str) -> Any:
+        row: int | None = self.__rows.get(record_id)
+
+        return None if row is None else self.__columns[name][row].item()
+
+    def upsert(self, values: tuple) -> None:
+        row: int | None = self.__rows.get(values[0])
+
+        if row is None:
+            if self.__size == self.__capacity:
+                self.__reserve()
+
+            row = self.__size
+            self.__size += 1
+            self.__rows[values[0]] = row
+            self.__valid[row] = True
+
+        for column, value in zip(self.__columns.values(), values):
+            column[row] = value
+
+    def delete(self, record_id: int) -> None:
+        row: int | None = self.__rows.pop(record_id, None)
+
+        if row is not None:
+            self.__valid[row] = False
+
+    def __reserve(self) -> None:
+        # Deleted rows are dropped first, the arrays only grow when at least half of them is alive.
+        live_rows: numpy.ndarray = numpy.flatnonzero(self.__valid[:self.__size])
+        live_count: int = len(live_rows)
+
+        self.__capacity = max(self.INITIAL_CAPACITY, live_count * 2)
+
+        for name, column in self.__columns.items():
+            temp_column: numpy.ndarray = numpy.zeros(self.__capacity, dtype=column.dtype)
+            temp_column[:live_count] = column[live_rows]
+            self.__columns[name] = temp_column
+
+        self.__valid = numpy.zeros(self.__capacity, dtype=bool)
+        self.__valid[:live_count] = True
+        self.__size = live_count
+
+        temp_ids: list[int] = self.__columns[next(iter(self.__columns))][:live_count].tolist()
+        self.__rows = dict(zip(temp_ids, range(live_count)))
+
+    def get_column(self, name: str) -> "numpy.ndarray":
+        return self.__columns[name][:self.__size][self.__valid[:self.__size]]
+
+    def get_columns(self) -> dict[str, "numpy.ndarray"]:
+        temp_valid: numpy.ndarray = self.__valid[:self.__size]
+
+        return {name: column[:self.__size][temp_valid] for name, column in self.__columns.items()}
+
+class LibraryAnalytics:
+    # Lower bounds of the customer age brackets in years, the last one is open ended.
+    AGE_BRACKETS: tuple[int] = (0, 18, 30, 45, 65)
+
+    def __init__(self, library: Library) -> None:
+        if numpy is None:
+            raise LibraryException("Library analytics require numpy to be installed.")
+
+        self.__library: Library = library
+        self.__lock: threading.Lock = threading.Lock()
+        self.__changes_lock: threading.Lock = threading.Lock()
+        self.__changes: list[tuple[str, tuple]] = list()
+        self.__author_codes: dict[str, int] = dict()
+        self.__authors: list[str] = list()
+
+        self.__customers: _ColumnTable = _ColumnTable({
+            "id": "int64",
+            "birth_day": "int64"
+        })
+
+        self.__books: _ColumnTable = _ColumnTable({
+            "id": "int64",
+            "type": "int8",
+            "author": "int32",
+            "published_day": "int64"
+        })
+
+        # Loans carry the type and author of their book, so the aggregates never join.
+        self.__loans: _ColumnTable = _ColumnTable({
+            "id": "int64",
+            "customer_id": "int64",
+            "loan_day": "int64",
+            "return_day": "int64",
+            "type": "int8",
+            "author": "int32"
+        })
+
+        self.__appliers: dict[str, Callable] = {
+            "insert_customer": lambda customer: self.__customers.upsert(self.__customer_row(customer)),
+            "delete_customer": self.__customers.delete,
+            "insert_book": lambda book: self.__books.upsert(self.__book_row(book)),
+            "delete_book": self.__books.delete,
+            "insert_loan": lambda loan: self.__loans.upsert(self.__loan_row(loan)),
+            "delete_loan": self.__loans.delete
+        }
+
+        # Changes made while the tables are exported are replayed over them, every one of them
+        # sets or drops a whole record, so the tables still end up matching the library.
+        self.__library.add_change_listener(self.__on_change)
+
+        with self.__lock:
+            self.__customers.load(map(self.__customer_row, self.__library.iter_customers()))
+            self.__books.load(map(self.__book_row, self.__library.iter_books()))
+            self.__loans.load(map(self.__loan_row, self.__library.iter_loans()))
+
+    def close(self) -> None:
+        self.__library.remove_change_listener(self.__on_change)
+
+    def __on_change(self, operation: str, args: tuple) -> None:
+        # Runs under the library write lock, so it only queues the change.
+        if operation not in self.__appliers:
+            return
+
+        with self.__changes_lock:
+            self.__changes.append((operation, args))
+
+    def __get_author_code(self, author: str) -> int:
+        code: int | None = self.__author_codes.get(author)
+
+        if code is None:
+            code = len(self.__authors)
+            self.__author_codes[author] = code
+            self.__authors.append(author)
+
+        return code
+
+    @staticmethod
+    def __customer_row(customer: Customer) -> tuple:
+        return customer.get_id(), _to_day(customer.get_birth_date())
+
+    def __book_row(self, book: Book) -> tuple:
+        return (book.get_id(), int(book.get_type()), self.__get_author_code(book.get_author()),
+                _to_day(book.get_date_published()))
+
+    def __loan_row(self, loan: Loan) -> tuple:
+        book_id: int = loan.get_book_id()
+        book_type: int | None = self.__books.get_value(book_id, "type")
+        author: int | None = self.__books.get_value(book_id, "author")
+
+        return (book_id, loan.get_customer_id(), _to_day(loan.get_loan_date()),
+                _to_day(loan.get_return_date()), -1 if book_type is None else book_type,
+                -1 if author is None else author)
+
+    def __refresh(self) -> int:
+        with self.__changes_lock:
+            changes, self.__changes = self.__changes, list()
+
+        for operation, args in changes:
+            self.__appliers[operation](*args)
+
+        return len(changes)
+
+    def refresh(self) -> int:
+        with self.__lock:
+            return self.__refresh()
+
+    def get_authors(self) -> tuple[str]:
+        with self.__lock:
+            return tuple(self.__authors)
+
+    def get_customers_columns(self) -> dict[str, "numpy.ndarray"]:
+        with self.__lock:
+            self.__refresh()
+
+            return self.__customers.get_columns()
+
+    def get_books_columns(self) -> dict[str, "numpy.ndarray"]:
+        with self.__lock:
+            self.__refresh()
+
+            return self.__books.get_columns()
+
+    def get_loans_columns(self) -> dict[str, "numpy.ndarray"]:
+        with self.__lock:
+            self.__refresh()
+
+            return self.__loans.get_columns()
+
+    def get_overdue_rate_by_type(self, as_of: datetime.date | None = None) -> dict[BookType, float]:
+        as_of_day: int = _to_day(datetime.date.today() if as_of is None else as_of)
+        minlength: int = max(BookType) + 1
+
+        with self.__lock:
+            self.__refresh()
+
+            temp_types: numpy.ndarray = self.__loans.get_column("type")
+            temp_late: numpy.ndarray = self.__loans.get_column("return_day") < as_of_day
+
+        # Loans whose book was unknown when they were recorded have no type.
+        temp_known: numpy.ndarray = temp_types >= 0
+        temp_types, temp_late = temp_types[temp_known], temp_late[temp_known]
+        totals: numpy.ndarray = numpy.bincount(temp_types, minlength=minlength)
+        late: numpy.ndarray = numpy.bincount(temp_types[temp_late], minlength=minlength)
+
+        return {
+            book_type: float(late[book_type] / totals[book_type]) if totals[book_type] else 0.0
+            for book_type in BookType
+        }
+
+    def get_loan_duration_distribution(self, book_type: BookType | None = None) -> dict[int, int]:
+        with self.__lock:
+            self.__refresh()
+
+            temp_durations: numpy.ndarray = \
+                self.__loans.get_column("return_day") - self.__loans.get_column("loan_day")
+
+            if book_type is not None:
+                temp_durations = temp_durations[self.__loans.get_column("type") == int(book_type)]
+
+        days, counts = numpy.unique(temp_durations, return_counts=True)
+
+        return dict(zip(days.tolist(), counts.tolist()))
+
+    def get_busiest_authors(self, limit: int = 10) -> list[tuple[str, int]]:
+        with self.__lock:
+            self.__refresh()
+
+            temp_authors: numpy.ndarray = self.__loans.get_column("author")
+            authors: list[str] = self.__authors
+
+            counts: numpy.ndarray = numpy.bincount(temp_authors[temp_authors >= 0], minlength=len(authors))
+
+        # Only the top of the counts gets sorted.
+        if limit < len(counts):
+            top_codes: numpy.ndarray = numpy.argpartition(-counts, limit)[:limit]
+        else:
+            top_codes = numpy.arange(len(counts))
+
+        top_codes = top_codes[numpy.lexsort((top_codes, -counts[top_codes]))]
+
+        return [(authors[i], int(counts[i])) for i in top_codes.tolist() if counts[i]]
+
+    def get_customer_age_brackets(self, as_of: datetime.date | None = None) -> dict[str, int]:
+        if as_of is None:
+            as_of = datetime.date.today()
+
+        with self.__lock:
+            self.__refresh()
+
+            temp_birth_days: numpy.ndarray = self.__customers.get_column("birth_day")
+
+        birth_years, birth_month_days = _split_days(temp_birth_days)
+        ages: numpy.ndarray = as_of.year - birth_years - (birth_month_days > as_of.month * 100 + as_of.day)
+        brackets: numpy.ndarray = numpy.searchsorted(self.AGE_BRACKETS, numpy.maximum(ages, 0), side="right") - 1
+        counts: numpy.ndarray = numpy.bincount(brackets, minlength=len(self.AGE_BRACKETS))
+
+        labels: list[str] = [
+            f"{lower}-{upper - 1}" for lower, upper in zip(self.AGE_BRACKETS, self.AGE_BRACKETS[1:])
+        ] + [f"{self.AGE_BRACKETS[-1]}+"]
+
+        return dict(zip(labels, counts.tolist()))
@@ -0,0 +1,48 @@
+import threading
+from typing import Callable
+from api_library.exceptions import LibraryException
+
+class AutoSaver:
+    def __init__(self, save: Callable[[], None], interval: float | None = None,
+                mutations_threshold: int | None = None) -> None:
+
+        if interval is None and mutations_threshold is None:
+            raise LibraryException("Autosave needs an interval or a mutations threshold.")
+
+        self.__save: Callable[[], None] = save
+        self.__interval: float | None = interval
+        self.__mutations_threshold: int | None = mutations_threshold
+        self.__wake_event: threading.Event = threading.Event()
+        self.__stopped: bool = False
+        self.__last_error: LibraryException | None = None
+        self.__thread: threading.Thread = threading.Thread(
+            target=self.__run, name="library-autosave", daemon=True)
+
+    def start(self) -> None:
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stopped = True
+        self.__wake_event.set()
+        self.__thread.join()
+
+    def notify_mutations(self, unsaved_count: int) -> None:
+        if self.__mutations_threshold is not None and unsaved_count >= self.__mutations_threshold:
+            self.__wake_event.set()
+
+    def get_last_error(self) -> LibraryException | None:
+        return self.__last_error
+
+    def __run(self) -> None:
+        while True:
+            self.__wake_event.wait(self.__interval)
+            self.__wake_event.clear()
+
+            try:
+                self.__save()
+                self.__last_error = None
+            except LibraryException as error:
+                self.__last_error = error
+
+            if self.__stopped:
+                break
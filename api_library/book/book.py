@@ -1,14 +1,24 @@
+import sys
 import datetime
 from api_library.book.book_type import BookType
+from api_library.record import Record
+
+class Book(Record):
+    __slots__ = (
+        "__book_id",
+        "__book_type",
+        "__name",
+        "__author",
+        "__date_published"
+    )
 
-class Book:
     def __init__(self, book_id: int, book_type: BookType, 
                 name: str, author: str, date_published: datetime.date) -> None:
         
         self.__book_id: int = book_id
         self.__book_type: BookType = book_type
         self.__name: str = name
-        self.__author: str = author
+        self.__author: str = sys.intern(author)
         self.__date_published: datetime.date = date_published
 
     def get_id(self) -> int:
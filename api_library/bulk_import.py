@@ -0,0 +1,109 @@
+import os
+import csv
+import json
+import operator
+import datetime
+from typing import Any, Iterator, Mapping
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.book.book_type import BookType
+from api_library.loan import Loan
+from api_library.utils import to_datetime
+
+from api_library.exceptions import (
+    LibraryException,
+    CustomerException,
+    BookException,
+    LoanException
+)
+
+class ImportReport:
+    def __init__(self) -> None:
+        self.__imported_count: int = 0
+        self.__errors: list[tuple[int, LibraryException]] = list()
+
+    def add_imported(self, count: int) -> None:
+        self.__imported_count += count
+
+    def add_error(self, row_number: int, error: LibraryException) -> None:
+        self.__errors.append((row_number, error))
+
+    def get_imported_count(self) -> int:
+        return self.__imported_count
+
+    def get_errors(self) -> tuple[tuple[int, LibraryException]]:
+        return tuple(sorted(self.__errors, key=operator.itemgetter(0)))
+
+    def is_successful(self) -> bool:
+        return not self.__errors
+
+def read_rows(file_path: str) -> Iterator[dict[str, Any]]:
+    extension: str = os.path.splitext(file_path)[1].lower()
+
+    if extension not in (".csv", ".jsonl"):
+        raise LibraryException(f"Unsupported import file format '{extension}'.")
+
+    try:
+        file_handler = open(file_path, "r", encoding="utf-8", newline="")
+    except OSError as file_exception:
+        raise LibraryException(file_exception)
+
+    with file_handler:
+        if extension == ".csv":
+            yield from csv.DictReader(file_handler)
+            return
+
+        for line in file_handler:
+            if not line.strip():
+                continue
+
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # An empty row fails validation and is reported with its row number.
+                yield dict()
+
+def parse_date(value: Any) -> datetime.date:
+    if isinstance(value, datetime.date):
+        return value
+
+    if "T" in value or " " in value:
+        return datetime.datetime.fromisoformat(value)
+
+    return datetime.date.fromisoformat(value)
+
+def parse_book_type(value: Any) -> BookType:
+    if isinstance(value, BookType):
+        return value
+
+    if isinstance(value, str) and not value.isdigit():
+        return BookType[value.upper()]
+
+    return BookType(int(value))
+
+def parse_customer_row(row: Mapping[str, Any]) -> Customer:
+    try:
+        return Customer(int(row["id"]), row["name"], row["address"],
+                        row["email"], parse_date(row["birth_date"]))
+    except (KeyError, TypeError, ValueError) as error:
+        raise CustomerException(f"Invalid customer row ({error!r}).")
+
+def parse_book_row(row: Mapping[str, Any]) -> Book:
+    try:
+        return Book(int(row["id"]), parse_book_type(row["type"]), row["name"],
+                    row["author"], parse_date(row["date_published"]))
+    except (KeyError, TypeError, ValueError) as error:
+        raise BookException(f"Invalid book row ({error!r}).")
+
+def parse_loan_row(row: Mapping[str, Any]) -> Loan:
+    try:
+        loan_date: datetime.date = parse_date(row["loan_date"])
+        return_date: datetime.date = parse_date(row["return_date"])
+
+        # Dates and datetimes do not compare, so a mixed row is widened to datetimes.
+        if isinstance(loan_date, datetime.datetime) != isinstance(return_date, datetime.datetime):
+            loan_date, return_date = to_datetime(loan_date), to_datetime(return_date)
+
+        return Loan(int(row["customer_id"]), int(row["book_id"]), loan_date, return_date)
+    except (KeyError, TypeError, ValueError) as error:
+        raise LoanException(f"Invalid loan row ({error!r}).")
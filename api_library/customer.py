@@ -1,6 +1,15 @@
 from datetime import date
+from api_library.record import Record
+
+class Customer(Record):
+    __slots__ = (
+        "__customer_id",
+        "__name",
+        "__address",
+        "__email",
+        "__birth_date"
+    )
 
-class Customer:
     def __init__(self, customer_id: int, name: str, address: str, 
                 email: str, birth_date: date) -> None:
         
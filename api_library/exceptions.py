@@ -11,5 +11,9 @@ class BookException(LibraryException):
         super().__init__(*args)
 
 class LoanException(LibraryException):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+class ReservationException(LibraryException):
     def __init__(self, *args: object) -> None:
         super().__init__(*args)
\ No newline at end of file
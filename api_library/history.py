@@ -0,0 +1,297 @@
+import os
+import struct
+import datetime
+import threading
+from typing import BinaryIO, Iterator
+from api_library.loan import Loan
+from api_library.record import Record
+from api_library.utils import encode_date, decode_date
+from api_library.exceptions import LibraryException
+
+class LoanHistoryEntry(Record):
+    __slots__ = (
+        "__loan",
+        "__closed_date"
+    )
+
+    def __init__(self, loan: Loan, closed_date: datetime.datetime) -> None:
+        self.__loan: Loan = loan
+        self.__closed_date: datetime.datetime = closed_date
+
+    def get_loan(self) -> Loan:
+        return self.__loan
+
+    def get_closed_date(self) -> datetime.datetime:
+        return self.__closed_date
+
+class _IdFilter:
+    # A bloom filter, a segment is only opened for an id the filter might contain.
+    BITS_LOG2: int = 16
+    MULTIPLIERS: tuple[int] = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9)
+
+    def __init__(self, bits: bytes | None = None) -> None:
+        self.__bits: bytearray = bytearray(bits if bits is not None else 1 << (self.BITS_LOG2 - 3))
+
+    @classmethod
+    def get_size(cls) -> int:
+        return 1 << (cls.BITS_LOG2 - 3)
+
+    @classmethod
+    def __get_positions(cls, value: int) -> Iterator[int]:
+        for multiplier in cls.MULTIPLIERS:
+            yield ((value * multiplier) & 0xFFFFFFFFFFFFFFFF) >> (64 - cls.BITS_LOG2)
+
+    def add(self, value: int) -> None:
+        for position in self.__get_positions(value):
+            self.__bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, value: int) -> bool:
+        return all(self.__bits[i >> 3] & (1 << (i & 7)) for i in self.__get_positions(value))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.__bits)
+
+class _Segment:
+    # Count, then the lowest and highest loan and closing dates as encoded by encode_date.
+    SUMMARY: struct.Struct = struct.Struct("<Qqqqq")
+
+    def __init__(self) -> None:
+        self.__count: int = 0
+        self.__loan_range: list[int] = [0, 0]
+        self.__closed_range: list[int] = [0, 0]
+        self.__customers: _IdFilter = _IdFilter()
+        self.__books: _IdFilter = _IdFilter()
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def add(self, row: tuple[int, int, int, int, int]) -> None:
+        customer_id, book_id, loan_date, _, closed_date = row
+
+        if not self.__count:
+            self.__loan_range = [loan_date, loan_date]
+            self.__closed_range = [closed_date, closed_date]
+        else:
+            self.__loan_range = [min(self.__loan_range[0], loan_date), max(self.__loan_range[1], loan_date)]
+            self.__closed_range = [min(self.__closed_range[0], closed_date), max(self.__closed_range[1], closed_date)]
+
+        self.__customers.add(customer_id)
+        self.__books.add(book_id)
+        self.__count += 1
+
+    def may_match(self, customer_id: int | None, book_id: int | None,
+                lower_us: int | None, end_us: int | None) -> bool:
+
+        # Dates are compared in microseconds, a plain date counts as its midnight, end_us is exclusive.
+        if lower_us is not None and self.__closed_range[1] >> 1 < lower_us:
+            return False
+
+        if end_us is not None and self.__loan_range[0] >> 1 >= end_us:
+            return False
+
+        if customer_id is not None and not self.__customers.might_contain(customer_id):
+            return False
+
+        return book_id is None or self.__books.might_contain(book_id)
+
+    def to_bytes(self) -> bytes:
+        return self.SUMMARY.pack(self.__count, *self.__loan_range, *self.__closed_range) + \
+            self.__customers.to_bytes() + self.__books.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "_Segment":
+        filter_size: int = _IdFilter.get_size()
+
+        if len(data) != cls.SUMMARY.size + 2 * filter_size:
+            raise ValueError("Unexpected summary size.")
+
+        segment: _Segment = cls()
+        count, min_loan, max_loan, min_closed, max_closed = cls.SUMMARY.unpack_from(data)
+        segment.__count = count
+        segment.__loan_range = [min_loan, max_loan]
+        segment.__closed_range = [min_closed, max_closed]
+        segment.__customers = _IdFilter(data[cls.SUMMARY.size:cls.SUMMARY.size + filter_size])
+        segment.__books = _IdFilter(data[cls.SUMMARY.size + filter_size:])
+
+        return segment
+
+class LoanHistory:
+    # Customer id, book id, loan date, return date and closing date.
+    RECORD: struct.Struct = struct.Struct("<qqqqq")
+    READ_CHUNK_RECORDS: int = 4096
+
+    __SEGMENT_EXTENSION: str = ".segment"
+    __SUMMARY_EXTENSION: str = ".summary"
+
+    def __init__(self, directory: str) -> None:
+        self.__directory: str = directory
+        self.__lock: threading.Lock = threading.Lock()
+        self.__segments: dict[str, _Segment] = dict()
+        self.__changed_segments: set[str] = set()
+        self.__file_handler: BinaryIO | None = None
+        self.__file_segment: str | None = None
+
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+            self.__load()
+        except OSError as file_exception:
+            raise LibraryException(file_exception)
+
+    def __get_path(self, segment_name: str, extension: str) -> str:
+        return os.path.join(self.__directory, segment_name + extension)
+
+    def __load(self) -> None:
+        for file_name in sorted(os.listdir(self.__directory)):
+            if not file_name.endswith(self.__SEGMENT_EXTENSION):
+                continue
+
+            segment_name: str = file_name.removesuffix(self.__SEGMENT_EXTENSION)
+            segment_path: str = self.__get_path(segment_name, self.__SEGMENT_EXTENSION)
+            count, remainder = divmod(os.path.getsize(segment_path), self.RECORD.size)
+            segment: _Segment | None = None
+
+            try:
+                with open(self.__get_path(segment_name, self.__SUMMARY_EXTENSION), "rb") as file_handler:
+                    segment = _Segment.from_bytes(file_handler.read())
+            except (OSError, ValueError, struct.error):
+                pass
+
+            # Summaries are written after their segment, a crash in between leaves them behind.
+            if segment is None or segment.get_count() != count or remainder:
+                if remainder:
+                    os.truncate(segment_path, count * self.RECORD.size)
+
+                segment = _Segment()
+
+                for row in self.__read_rows(segment_path, count):
+                    segment.add(row)
+
+                self.__changed_segments.add(segment_name)
+
+            self.__segments[segment_name] = segment
+
+    def __read_rows(self, segment_path: str, count: int) -> Iterator[tuple[int, int, int, int, int]]:
+        chunk_size: int = self.READ_CHUNK_RECORDS * self.RECORD.size
+        remaining_size: int = count * self.RECORD.size
+
+        with open(segment_path, "rb") as file_handler:
+            while remaining_size > 0:
+                chunk: bytes = file_handler.read(min(chunk_size, remaining_size))
+
+                if not chunk:
+                    break
+
+                remaining_size -= len(chunk)
+
+                yield from self.RECORD.iter_unpack(chunk)
+
+    @staticmethod
+    def __get_segment_name(closed_date: datetime.date) -> str:
+        return f"{closed_date.year:04d}-{closed_date.month:02d}"
+
+    def append(self, loan: Loan, closed_date: datetime.datetime) -> None:
+        segment_name: str = self.__get_segment_name(closed_date)
+        row: tuple[int, int, int, int, int] = (
+            loan.get_customer_id(),
+            loan.get_book_id(),
+            encode_date(loan.get_loan_date()),
+            encode_date(loan.get_return_date()),
+            encode_date(closed_date)
+        )
+
+        with self.__lock:
+            try:
+                # Loans are closed in time order, so only the current month's segment stays open.
+                if self.__file_segment != segment_name:
+                    self.__close_file()
+                    self.__file_handler = open(self.__get_path(segment_name, self.__SEGMENT_EXTENSION), "ab")
+                    self.__file_segment = segment_name
+
+                self.__file_handler.write(self.RECORD.pack(*row))
+            except OSError as file_exception:
+                raise LibraryException(file_exception)
+
+            self.__segments.setdefault(segment_name, _Segment()).add(row)
+            self.__changed_segments.add(segment_name)
+
+    def __close_file(self) -> None:
+        if self.__file_handler is not None:
+            self.__file_handler.close()
+            self.__file_handler = None
+            self.__file_segment = None
+
+    def flush(self) -> None:
+        with self.__lock:
+            try:
+                if self.__file_handler is not None:
+                    self.__file_handler.flush()
+                    os.fsync(self.__file_handler.fileno())
+
+                # Only summaries of segments appended to since the last flush are rewritten.
+                for segment_name in sorted(self.__changed_segments):
+                    summary_path: str = self.__get_path(segment_name, self.__SUMMARY_EXTENSION)
+
+                    with open(f"{summary_path}.tmp", "wb") as file_handler:
+                        file_handler.write(self.__segments[segment_name].to_bytes())
+
+                    os.replace(f"{summary_path}.tmp", summary_path)
+            except OSError as file_exception:
+                raise LibraryException(file_exception)
+
+            self.__changed_segments.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+        with self.__lock:
+            self.__close_file()
+
+    def get_loans(self, customer_id: int | None = None, book_id: int | None = None,
+                start_date: datetime.date | None = None,
+                end_date: datetime.date | None = None) -> tuple[LoanHistoryEntry]:
+
+        # A loan is in the range when it was open at any moment of it, a plain end date includes its whole day.
+        lower_us: int | None = None if start_date is None else encode_date(start_date) >> 1
+        end_us: int | None = None
+
+        if isinstance(end_date, datetime.datetime):
+            end_us = (encode_date(end_date) >> 1) + 1
+        elif end_date is not None:
+            end_us = encode_date(end_date + datetime.timedelta(days=1)) >> 1
+
+        entries: list[LoanHistoryEntry] = list()
+
+        with self.__lock:
+            try:
+                if self.__file_handler is not None:
+                    self.__file_handler.flush()
+
+                for segment_name in sorted(self.__segments):
+                    segment: _Segment = self.__segments[segment_name]
+
+                    if not segment.may_match(customer_id, book_id, lower_us, end_us):
+                        continue
+
+                    segment_path: str = self.__get_path(segment_name, self.__SEGMENT_EXTENSION)
+
+                    for row in self.__read_rows(segment_path, segment.get_count()):
+                        row_customer_id, row_book_id, loan_date, return_date, closed_date = row
+
+                        if customer_id is not None and row_customer_id != customer_id:
+                            continue
+
+                        if book_id is not None and row_book_id != book_id:
+                            continue
+
+                        if lower_us is not None and closed_date >> 1 < lower_us:
+                            continue
+
+                        if end_us is not None and loan_date >> 1 >= end_us:
+                            continue
+
+                        loan: Loan = Loan(row_customer_id, row_book_id, decode_date(loan_date), decode_date(return_date))
+                        entries.append(LoanHistoryEntry(loan, decode_date(closed_date)))
+            except OSError as file_exception:
+                raise LibraryException(file_exception)
+
+        return tuple(entries)
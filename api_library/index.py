@@ -0,0 +1,117 @@
+import bisect
+import itertools
+import operator
+from typing import Any, Hashable, Iterable, Iterator
+
+class HashIndex:
+    def __init__(self) -> None:
+        self.__entries: dict[Hashable, dict[int, None]] = dict()
+
+    def add(self, key: Hashable, item_id: int) -> None:
+        self.__entries.setdefault(key, dict())[item_id] = None
+
+    def remove(self, key: Hashable, item_id: int) -> None:
+        temp_item_ids: dict[int, None] | None = self.__entries.get(key)
+
+        if temp_item_ids is None:
+            return
+
+        temp_item_ids.pop(item_id, None)
+
+        if not temp_item_ids:
+            del self.__entries[key]
+
+    def get(self, key: Hashable) -> tuple[int]:
+        return tuple(self.__entries.get(key, ()))
+
+    def iter(self, key: Hashable) -> Iterator[int]:
+        return iter(self.__entries.get(key, ()))
+
+    def count(self, key: Hashable) -> int:
+        return len(self.__entries.get(key, ()))
+
+    def get_first(self, key: Hashable) -> int | None:
+        temp_item_ids: dict[int, None] | None = self.__entries.get(key)
+
+        if not temp_item_ids:
+            return None
+
+        return next(iter(temp_item_ids))
+
+    def copy(self) -> "HashIndex":
+        temp_index: HashIndex = HashIndex()
+        temp_index.__entries = {key: item_ids.copy() for key, item_ids in self.__entries.items()}
+
+        return temp_index
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+class SortedIndex:
+    def __init__(self) -> None:
+        self.__keys: list[Any] = list()
+        self.__item_ids: list[int] = list()
+
+    def add(self, key: Any, item_id: int) -> None:
+        position: int = bisect.bisect_right(self.__keys, key)
+        self.__keys.insert(position, key)
+        self.__item_ids.insert(position, item_id)
+
+    def add_many(self, entries: Iterable[tuple[Any, int]]) -> None:
+        temp_entries: list[tuple[Any, int]] = sorted(
+            itertools.chain(zip(self.__keys, self.__item_ids), entries), key=operator.itemgetter(0))
+
+        self.__keys = [i[0] for i in temp_entries]
+        self.__item_ids = [i[1] for i in temp_entries]
+
+    def remove(self, key: Any, item_id: int) -> None:
+        position: int = bisect.bisect_left(self.__keys, key)
+        end_position: int = bisect.bisect_right(self.__keys, key)
+
+        for i in range(position, end_position):
+            if self.__item_ids[i] != item_id:
+                continue
+
+            del self.__keys[i]
+            del self.__item_ids[i]
+            break
+
+    def __get_bounds(self, lower: Any, upper: Any, include_upper: bool) -> tuple[int, int]:
+        position: int = 0
+        end_position: int = len(self.__keys)
+
+        if lower is not None:
+            position = bisect.bisect_left(self.__keys, lower)
+
+        if upper is not None:
+            if include_upper:
+                end_position = bisect.bisect_right(self.__keys, upper)
+            else:
+                end_position = bisect.bisect_left(self.__keys, upper)
+
+        return position, max(position, end_position)
+
+    def get_range(self, lower: Any = None, upper: Any = None, 
+                include_upper: bool = False) -> tuple[int]:
+        
+        position, end_position = self.__get_bounds(lower, upper, include_upper)
+
+        return tuple(self.__item_ids[position:end_position])
+
+    def count_range(self, lower: Any = None, upper: Any = None,
+                    include_upper: bool = False) -> int:
+
+        position, end_position = self.__get_bounds(lower, upper, include_upper)
+
+        return end_position - position
+
+    def copy(self) -> "SortedIndex":
+        temp_index: SortedIndex = SortedIndex()
+        temp_index.__keys = self.__keys.copy()
+        temp_index.__item_ids = self.__item_ids.copy()
+
+        return temp_index
+
+    def clear(self) -> None:
+        self.__keys.clear()
+        self.__item_ids.clear()
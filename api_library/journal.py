@@ -0,0 +1,90 @@
+import os
+import pickle
+from typing import BinaryIO, Iterator
+
+class Journal:
+    def __init__(self, file_journal: str) -> None:
+        self.__file_journal: str = file_journal
+        self.__file_handler: BinaryIO | None = None
+
+    def append(self, sequence: int, records: list[tuple[str, tuple]]) -> None:
+        if self.__file_handler is None:
+            self.__file_handler = open(self.__file_journal, "ab")
+
+        pickle.dump((sequence, records), self.__file_handler)
+        self.__file_handler.flush()
+
+    def sync(self) -> None:
+        if self.__file_handler is None:
+            return
+
+        self.__file_handler.flush()
+        os.fsync(self.__file_handler.fileno())
+
+    def replay(self) -> Iterator[tuple[int, list[tuple[str, tuple]]]]:
+        if not os.path.exists(self.__file_journal):
+            return
+
+        with open(self.__file_journal, "r+b") as file_handler:
+            while True:
+                position: int = file_handler.tell()
+
+                try:
+                    record = pickle.load(file_handler)
+                except Exception:
+                    # Clean end of the log, or a record torn by a crash mid-append
+                    # which is dropped together with everything after it.
+                    file_handler.truncate(position)
+                    break
+
+                yield record
+
+    def read_from(self, position: int) -> tuple[list[tuple[int, list[tuple[str, tuple]]]], int, int | None]:
+        # Readers of a live journal stop before a record still being appended and never truncate.
+        if not os.path.exists(self.__file_journal):
+            return list(), position, None
+
+        records: list[tuple[int, list[tuple[str, tuple]]]] = list()
+
+        with open(self.__file_journal, "rb") as file_handler:
+            file_id: int = os.fstat(file_handler.fileno()).st_ino
+            file_handler.seek(position)
+
+            while True:
+                try:
+                    records.append(pickle.load(file_handler))
+                except Exception:
+                    break
+
+                position = file_handler.tell()
+
+        return records, position, file_id
+
+    def truncate(self, sequence: int | None = None) -> None:
+        # Records up to sequence are dropped, all of them when it is not given.
+        kept_records: list[tuple[int, list[tuple[str, tuple]]]] = list()
+
+        if sequence is not None:
+            self.sync()
+            kept_records = [i for i in self.read_from(0)[0] if i[0] > sequence]
+
+        self.close()
+
+        # A new file replaces the old one, so readers of the journal notice the truncation.
+        temp_file_journal: str = f"{self.__file_journal}.tmp"
+
+        with open(temp_file_journal, "wb") as file_handler:
+            for record in kept_records:
+                pickle.dump(record, file_handler)
+
+            file_handler.flush()
+            os.fsync(file_handler.fileno())
+
+        os.replace(temp_file_journal, self.__file_journal)
+
+    def close(self) -> None:
+        if self.__file_handler is None:
+            return
+
+        self.__file_handler.close()
+        self.__file_handler = None
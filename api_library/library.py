@@ -1,173 +1,806 @@
-import os
-import pickle
+import time
 import datetime
+import functools
+import threading
+import contextlib
+from typing import Any, Callable, ContextManager, Iterable, Iterator, Mapping
 from api_library.customer import Customer
 from api_library.book.book import Book
 from api_library.book.book_type import BookType
 from api_library.loan import Loan
+from api_library.loan_batch import LoanBatch
+from api_library.reservation import Reservation
+from api_library.storage.storage_engine import StorageEngine
+from api_library.storage.storage_type import StorageType
+from api_library.search import BookSearchIndex
+from api_library.locking import NullLock, ReadWriteLock
+from api_library.autosave import AutoSaver
+from api_library.metrics import LibraryMetrics
+from api_library.history import LoanHistory, LoanHistoryEntry
+from api_library.utils import to_datetime
+from api_library.query import BOOK_FIELDS, LOAN_FIELDS, Predicate
+
+from api_library.bulk_import import (
+    ImportReport,
+    parse_customer_row,
+    parse_book_row,
+    parse_loan_row
+)
 
 from api_library.exceptions import (
     LibraryException,
     CustomerException,
     BookException,
-    LoanException
+    LoanException,
+    ReservationException
 )
 
 class Library:
-    def __init__(self, file_database: str) -> None:
-        self.__file_database: str = f"{file_database}.pickle"
-        self.__customers: dict[int, Customer] = dict()
-        self.__books: dict[int, Book] = dict()
-        self.__loans: dict[int, Loan] = dict()
-
-        if not os.path.exists(self.__file_database):
-            self.save()
-        else:
-            self.__load()
-
-    def __load(self) -> None:
-        with open(self.__file_database, "rb") as file_handler:
-            temp_data = pickle.load(file_handler)
-            self.__dict__.update(temp_data)
+    IMPORT_BATCH_SIZE: int = 1000
+    RESERVATION_TIME: datetime.timedelta = datetime.timedelta(days=14)
+
+    INSTRUMENTED_METHODS: tuple[str] = (
+        "save",
+        "compact",
+        "add_customer",
+        "get_customer_by_id",
+        "get_customer_by_name",
+        "get_customer_loans",
+        "remove_customer",
+        "get_all_customers",
+        "iter_customers",
+        "add_book",
+        "remove_book",
+        "get_book_by_id",
+        "get_books_by_name",
+        "get_books_by_author",
+        "get_all_books",
+        "iter_books",
+        "iter_books_by_name",
+        "iter_books_by_author",
+        "search_books",
+        "is_book_loaned",
+        "loan_book",
+        "return_book",
+        "apply_loan_batch",
+        "reserve_book",
+        "cancel_reservation",
+        "get_book_reservations",
+        "get_customer_reservations",
+        "expire_reservations",
+        "get_loan",
+        "get_all_loans",
+        "iter_loans",
+        "get_all_late_loans",
+        "get_loans_due_between",
+        "query_books",
+        "query_loans",
+        "get_loan_history",
+        "import_customers",
+        "import_books",
+        "import_loans"
+    )
+
+    def __init__(self, file_database: str, journaling: bool = False,
+                storage_type: StorageType = StorageType.PICKLE,
+                thread_safe: bool = False, autosave_interval: float | None = None,
+                autosave_mutations: int | None = None, collect_metrics: bool = False,
+                foreign_customers: bool = False, loan_history: bool = False) -> None:
+
+        autosave: bool = autosave_interval is not None or autosave_mutations is not None
+        start_ns: int = time.perf_counter_ns()
+
+        self.__engine: StorageEngine = storage_type.create_engine(file_database, journaling)
+        self.__metrics: LibraryMetrics | None = None
+        self.__metrics_local: threading.local = threading.local()
+
+        # Without metrics nothing is wrapped, so the calls cost exactly what they did before.
+        if collect_metrics:
+            self.__metrics = LibraryMetrics()
+            self.__metrics.record("load", time.perf_counter_ns() - start_ns)
+
+            for name in self.INSTRUMENTED_METHODS:
+                setattr(self, name, self.__instrument(name, getattr(self, name)))
+
+        self.__search_index: BookSearchIndex | None = None
+        self.__search_index_lock: threading.Lock = threading.Lock()
+        # A shard holds loans of customers stored by other shards, whose existence the router checks.
+        self.__foreign_customers: bool = foreign_customers
+        self.__thread_safe: bool = thread_safe or autosave
+        self.__lock: ReadWriteLock | NullLock = ReadWriteLock() if self.__thread_safe else NullLock()
+        self.__save_lock: threading.Lock = threading.Lock()
+        self.__mutations_count: int = 0
+        self.__saved_mutations_count: int = 0
+        self.__autosaver: AutoSaver | None = None
+        # Closed loans are appended to month segments kept apart from the snapshot.
+        self.__history: LoanHistory | None = LoanHistory(f"{file_database}.history") if loan_history else None
+
+        if autosave:
+            temp_autosave: Callable[[], None] = self.__autosave
+
+            if self.__metrics is not None:
+                temp_autosave = self.__instrument("autosave", temp_autosave)
+
+            self.__autosaver = AutoSaver(temp_autosave, autosave_interval, autosave_mutations)
+            self.__autosaver.start()
+
+    def __instrument(self, name: str, method: Callable) -> Callable:
+        metrics: LibraryMetrics = self.__metrics
+        local: threading.local = self.__metrics_local
+
+        @functools.wraps(method)
+        def instrumented(*args, **kwargs) -> Any:
+            # Public methods calling each other are only counted once, as the outer call.
+            if getattr(local, "active", False):
+                return method(*args, **kwargs)
+
+            local.active = True
+            start_ns: int = time.perf_counter_ns()
+
+            try:
+                result: Any = method(*args, **kwargs)
+            except Exception as error:
+                metrics.record(name, time.perf_counter_ns() - start_ns, error)
+                raise
+            finally:
+                local.active = False
+
+            metrics.record(name, time.perf_counter_ns() - start_ns)
+
+            return result
+
+        return instrumented
+
+    def get_metrics(self) -> LibraryMetrics | None:
+        return self.__metrics
+
+    def is_thread_safe(self) -> bool:
+        return self.__thread_safe
+
+    def __detach(self, items: Iterator) -> Iterator:
+        # A lazy page would outlive the read lock, so a shared library hands out a copy.
+        if self.__thread_safe:
+            return iter(tuple(items))
+
+        return items
+
+    @contextlib.contextmanager
+    def __scan(self, iter_items: Callable[[], Iterator]) -> Iterator[Iterator]:
+        # One engine iterator serves the whole listing, writers wait until the listing is closed.
+        with self.__lock.read():
+            yield iter_items()
+
+    def scan_customers(self) -> ContextManager[Iterator[Customer]]:
+        return self.__scan(self.__engine.iter_customers)
+
+    def scan_books(self) -> ContextManager[Iterator[Book]]:
+        return self.__scan(self.__engine.iter_books)
+
+    def scan_loans(self) -> ContextManager[Iterator[Loan]]:
+        return self.__scan(self.__engine.iter_loans)
+
+    def is_dirty(self) -> bool:
+        with self.__lock.read():
+            return self.__mutations_count != self.__saved_mutations_count
+
+    def get_autosave_error(self) -> LibraryException | None:
+        if self.__autosaver is None:
+            return None
+
+        return self.__autosaver.get_last_error()
+
+    def __commit(self) -> None:
+        self.__engine.commit()
+        self.__mutations_count += 1
+
+        if self.__autosaver is not None:
+            self.__autosaver.notify_mutations(self.__mutations_count - self.__saved_mutations_count)
+
+    def __autosave(self) -> None:
+        # The view is taken under the read lock, the disk is only touched after it is released.
+        with self.__save_lock:
+            with self.__lock.read():
+                if self.__mutations_count == self.__saved_mutations_count:
+                    return
+
+                mutations_count: int = self.__mutations_count
+                write_snapshot: Callable[[], None] = self.__engine.prepare_snapshot()
+
+            write_snapshot()
+            self.__saved_mutations_count = mutations_count
+
+            # The journal records the snapshot now holds are no longer needed to recover.
+            with self.__lock.write():
+                self.__engine.truncate_journal()
+
+            if self.__history is not None:
+                self.__history.flush()
+
+    def add_change_listener(self, listener: Callable[[str, tuple], None]) -> None:
+        # Listeners are called under the write lock with every applied storage operation.
+        with self.__lock.write():
+            self.__engine.add_listener(listener)
+
+    def remove_change_listener(self, listener: Callable[[str, tuple], None]) -> None:
+        with self.__lock.write():
+            self.__engine.remove_listener(listener)
+
+    def get_sequence(self) -> int:
+        with self.__lock.read():
+            return self.__engine.get_sequence()
+
+    def apply_replicated_records(self, sequence: int, records: list[tuple[str, tuple]]) -> bool:
+        with self.__lock.write():
+            if not self.__engine.apply_records(sequence, records):
+                return False
+
+            # Cheaper to rebuild the search index on demand than to replay the book records into it.
+            if any(operation in ("insert_book", "delete_book") for operation, _ in records):
+                self.__search_index = None
+
+            return True
 
     def save(self) -> None:
-        try:
-            with open(self.__file_database, "wb") as file_handler:
-                pickle.dump(self.__dict__, file_handler)
-                file_handler.close()
-        except Exception as file_exception:
-            raise LibraryException(file_exception)
+        with self.__save_lock, self.__lock.write():
+            self.__engine.save()
+            self.__saved_mutations_count = self.__mutations_count
+
+            if self.__history is not None:
+                self.__history.flush()
+
+    def compact(self) -> None:
+        with self.__save_lock, self.__lock.write():
+            self.__engine.compact()
+            self.__saved_mutations_count = self.__mutations_count
+
+            if self.__history is not None:
+                self.__history.flush()
+
+    def close(self) -> None:
+        if self.__autosaver is not None:
+            self.__autosaver.stop()
+            self.__autosaver = None
+
+        with self.__lock.write():
+            self.__engine.close()
+
+            if self.__history is not None:
+                self.__history.close()
+
+    def __record_history(self, loans: Iterable[Loan]) -> None:
+        if self.__history is None:
+            return
+
+        closed_date: datetime.datetime = datetime.datetime.now()
+
+        for loan in loans:
+            self.__history.append(loan, closed_date)
 
     def __is_customer_exists(self, customer_id: int) -> bool:
-        return customer_id in self.__customers
+        return self.__engine.has_customer(customer_id)
 
-    def add_customer(self, customer_id: int, name: str, address: str, 
-                    email: str, birth_date: datetime.date) -> None:
-        
-        if self.__is_customer_exists(customer_id):
+    def __check_new_customer(self, customer: Customer, pending_ids: set[int] = frozenset()) -> None:
+        customer_id: int = customer.get_id()
+
+        if customer_id in pending_ids or self.__is_customer_exists(customer_id):
             raise CustomerException(f"Customer (ID: {customer_id}) already exists.")
-        
-        self.__customers[customer_id] = Customer(customer_id, name, address, email, birth_date)
+
+    def add_customer(self, customer_id: int, name: str, address: str,
+                    email: str, birth_date: datetime.date) -> None:
+
+        with self.__lock.write():
+            customer: Customer = Customer(customer_id, name, address, email, birth_date)
+            self.__check_new_customer(customer)
+
+            self.__engine.insert_customer(customer)
+            self.__commit()
 
     def get_customer_by_id(self, customer_id: int) -> Customer:
-        if not self.__is_customer_exists(customer_id):
-            raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
-        
-        return self.__customers[customer_id]
+        with self.__lock.read():
+            if not self.__is_customer_exists(customer_id):
+                raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
 
-    def get_customer_by_name(self, name: str) -> Customer:
-        return_customer = None
+            return self.__engine.get_customer(customer_id)
 
-        for customer in self.__customers.values():
-            if customer.get_name() != name:
-                continue
+    def get_customer_by_name(self, name: str) -> Customer:
+        with self.__lock.read():
+            customer: Customer | None = self.__engine.get_customer_by_name(name)
 
-            return_customer = customer
-            break
+            if customer is None:
+                raise CustomerException(f"Customer (Name: {name}) does not exists.")
 
-        if return_customer is None:
-            raise CustomerException(f"Customer (Name: {name}) does not exists.")
-        
-        return return_customer
+            return customer
 
     def get_customer_loans(self, customer_id: int) -> tuple[Loan]:
-        if not self.__is_customer_exists(customer_id):
-            raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
-        
-        return tuple(i for i in self.__loans.values() if i.get_customer_id() == customer_id)
-    
+        with self.__lock.read():
+            if not self.__foreign_customers and not self.__is_customer_exists(customer_id):
+                raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
+
+            return self.__engine.get_customer_loans(customer_id)
+
     def remove_customer(self, customer_id: int) -> None:
-        if not self.__is_customer_exists(customer_id):
-            raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
-        
-        customer_loans: tuple[Loan] = self.get_customer_loans(customer_id)
+        with self.__lock.write():
+            if not self.__is_customer_exists(customer_id):
+                raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
+
+            loans: tuple[Loan] = self.__engine.get_customer_loans(customer_id)
+
+            for reservation in self.__engine.get_customer_reservations(customer_id):
+                self.__engine.delete_reservation(customer_id, reservation.get_book_id())
+
+            for loan in loans:
+                self.__engine.delete_loan(loan.get_book_id())
+                self.__hand_off(loan.get_book_id())
 
-        for loan in customer_loans:
-            temp_book_id: int = loan.get_book_id()
-            del self.__loans[temp_book_id]
-        
-        del self.__customers[customer_id]
+            self.__engine.delete_customer(customer_id)
+            self.__commit()
+            self.__record_history(loans)
 
     def get_all_customers(self) -> tuple[Customer]:
-        return tuple(self.__customers.values())
+        with self.__lock.read():
+            return self.__engine.get_all_customers()
+
+    def iter_customers(self, offset: int = 0, limit: int | None = None) -> Iterator[Customer]:
+        with self.__lock.read():
+            return self.__detach(self.__engine.iter_customers(offset, limit))
 
     def __is_book_exists(self, book_id: int) -> bool:
-        return book_id in self.__books
-    
-    def add_book(self, book_id: int, book_type: BookType, 
-                name: str, author: str, date_published: datetime.date) -> None:
-        
-        if self.__is_book_exists(book_id):
+        return self.__engine.has_book(book_id)
+
+    def __check_new_book(self, book: Book, pending_ids: set[int] = frozenset()) -> None:
+        book_id: int = book.get_id()
+
+        if book_id in pending_ids or self.__is_book_exists(book_id):
             raise BookException(f"Book (ID: {book_id}) already exists.")
-        
-        self.__books[book_id] = Book(book_id, book_type, name, author, date_published)
+
+    def add_book(self, book_id: int, book_type: BookType,
+                name: str, author: str, date_published: datetime.date) -> None:
+
+        with self.__lock.write():
+            book: Book = Book(book_id, book_type, name, author, date_published)
+            self.__check_new_book(book)
+
+            self.__engine.insert_book(book)
+            self.__commit()
+
+            if self.__search_index is not None:
+                self.__search_index.add_book(book)
 
     def remove_book(self, book_id: int) -> None:
-        if not self.__is_book_exists(book_id):
-            raise BookException(f"Book (ID: {book_id}) does not exists.")
-        
-        if book_id in self.__loans:
-            del self.__loans[book_id]
+        with self.__lock.write():
+            if not self.__is_book_exists(book_id):
+                raise BookException(f"Book (ID: {book_id}) does not exists.")
+
+            book: Book = self.__engine.get_book(book_id)
+            loans: tuple[Loan] = ()
+
+            if self.is_book_loaned(book_id):
+                loans = (self.__engine.get_loan(book_id),)
+                self.__engine.delete_loan(book_id)
+
+            for reservation in self.__engine.get_book_reservations(book_id):
+                self.__engine.delete_reservation(reservation.get_customer_id(), book_id)
+
+            self.__engine.delete_book(book_id)
+            self.__commit()
+            self.__record_history(loans)
+
+            if self.__search_index is not None:
+                self.__search_index.remove_book(book)
 
-        del self.__books[book_id]
-        
     def get_book_by_id(self, book_id: int) -> Book:
-        if not self.__is_book_exists(book_id):
-            raise BookException(f"Customer (ID: {book_id}) does not exists.")
-        
-        return self.__books[book_id]
+        with self.__lock.read():
+            if not self.__is_book_exists(book_id):
+                raise BookException(f"Customer (ID: {book_id}) does not exists.")
+
+            return self.__engine.get_book(book_id)
 
     def get_books_by_name(self, name: str) -> tuple[Book]:
-        return tuple(i for i in self.__books.values() if i.get_name() == name)
-    
+        with self.__lock.read():
+            return self.__engine.get_books_by_name(name)
+
     def get_books_by_author(self, author: str) -> tuple[Book]:
-        return tuple(i for i in self.__books.values() if i.get_author() == author)
+        with self.__lock.read():
+            return self.__engine.get_books_by_author(author)
 
     def get_all_books(self) -> tuple[Book]:
-        return tuple(self.__books.values())
+        with self.__lock.read():
+            return self.__engine.get_all_books()
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        with self.__lock.read():
+            return self.__detach(self.__engine.iter_books(offset, limit))
+
+    def iter_books_by_name(self, name: str, offset: int = 0,
+                        limit: int | None = None) -> Iterator[Book]:
+
+        with self.__lock.read():
+            return self.__detach(self.__engine.iter_books_by_name(name, offset, limit))
+
+    def iter_books_by_author(self, author: str, offset: int = 0,
+                            limit: int | None = None) -> Iterator[Book]:
+
+        with self.__lock.read():
+            return self.__detach(self.__engine.iter_books_by_author(author, offset, limit))
+
+    def __get_search_index(self) -> BookSearchIndex:
+        # Readers may get here together, one builds the index and it is only published once complete.
+        with self.__search_index_lock:
+            if self.__search_index is None:
+                search_index: BookSearchIndex = BookSearchIndex()
+                search_index.add_books(self.__engine.iter_books())
+                self.__search_index = search_index
+
+            return self.__search_index
+
+    def search_books(self, query: str, limit: int = 10, fuzzy: bool = True) -> tuple[Book]:
+        with self.__lock.read():
+            book_ids: list[int] = self.__get_search_index().search(query, limit, fuzzy)
+
+            return tuple(self.__engine.get_book(i) for i in book_ids)
 
     def is_book_loaned(self, book_id: int) -> bool:
-        return book_id in self.__loans
-    
-    def loan_book(self, customer_id: int, book_id: int, loan_date: datetime.date, 
-                return_date: datetime.date) -> None:
-        
-        if not self.__is_customer_exists(customer_id):
+        with self.__lock.read():
+            return self.__engine.has_loan(book_id)
+
+    def __check_new_loan(self, loan: Loan, pending_ids: set[int] = frozenset(),
+                        returned_ids: set[int] = frozenset()) -> None:
+
+        customer_id: int = loan.get_customer_id()
+        book_id: int = loan.get_book_id()
+        loan_date: datetime.date = loan.get_loan_date()
+        return_date: datetime.date = loan.get_return_date()
+
+        if not self.__foreign_customers and not self.__is_customer_exists(customer_id):
             raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
-        
+
         if not self.__is_book_exists(book_id):
             raise BookException(f"Book (ID: {book_id}) does not exists.")
 
-        if self.is_book_loaned(book_id):
+        if book_id in pending_ids or (book_id not in returned_ids and self.is_book_loaned(book_id)):
             raise LoanException(f"Book (ID: {book_id}) is already loaned.")
-        
+
         if loan_date > return_date:
             raise LoanException(f"Loan return date can not be earlier than loan date.")
-        
-        temp_book_max_loan_time: datetime.timedelta = self.__books[book_id].get_type().get_max_loan_time()
-        
+
+        temp_book_max_loan_time: datetime.timedelta = self.__engine.get_book(book_id).get_type().get_max_loan_time()
+
         if return_date - loan_date > temp_book_max_loan_time:
             raise LoanException(f"Maximum loan time for book (ID: {book_id}) is {temp_book_max_loan_time.days} day(s).")
-        
-        self.__loans[book_id] = Loan(customer_id, book_id, loan_date, return_date)
 
-    def return_book(self, book_id: int) -> None:
+        # Nobody jumps the queue of a reserved book, only the first customer in it may borrow it.
+        first_reservation: Reservation | None = self.__engine.get_first_reservation(book_id)
+
+        if first_reservation is not None and first_reservation.get_customer_id() != customer_id:
+            raise LoanException(f"Book (ID: {book_id}) is reserved by customer (ID: {first_reservation.get_customer_id()}).")
+
+    def __claim_reservations(self, loans: Iterable[Loan]) -> None:
+        # A customer borrowing a book they reserved leaves its queue.
+        for loan in loans:
+            if self.__engine.has_reservation(loan.get_customer_id(), loan.get_book_id()):
+                self.__engine.delete_reservation(loan.get_customer_id(), loan.get_book_id())
+
+    def loan_book(self, customer_id: int, book_id: int, loan_date: datetime.date,
+                return_date: datetime.date) -> None:
+
+        with self.__lock.write():
+            loan: Loan = Loan(customer_id, book_id, loan_date, return_date)
+            self.__expire_reservations(datetime.datetime.now())
+            self.__check_new_loan(loan)
+
+            self.__engine.insert_loan(loan)
+            self.__claim_reservations((loan,))
+            self.__commit()
+
+    def __check_return(self, book_id: int, pending_ids: set[int] = frozenset(),
+                    returned_ids: set[int] = frozenset()) -> None:
+
         if not self.__is_book_exists(book_id):
             raise BookException(f"Book (ID: {book_id}) is not exists.")
-        
-        if not self.is_book_loaned(book_id):
+
+        if book_id not in pending_ids and (book_id in returned_ids or not self.is_book_loaned(book_id)):
             raise LoanException(f"Book (ID: {book_id}) is not loaned.")
-        
-        del self.__loans[book_id]
 
-    def get_loan(self, book_id: int) -> Loan:
+    def return_book(self, book_id: int) -> None:
+        with self.__lock.write():
+            self.__check_return(book_id)
+
+            loan: Loan = self.__engine.get_loan(book_id)
+            self.__engine.delete_loan(book_id)
+            self.__hand_off(book_id)
+            self.__commit()
+            self.__record_history((loan,))
+
+    def apply_loan_batch(self, batch: LoanBatch) -> None:
+        with self.__lock.write():
+            operations: tuple[tuple[str, Loan | int]] = batch.get_operations()
+            pending_ids: set[int] = set()
+            returned_ids: set[int] = set()
+
+            self.__expire_reservations(datetime.datetime.now())
+
+            # The whole batch is validated against its own effects before anything is applied.
+            for operation, value in operations:
+                if operation == LoanBatch.LOAN:
+                    self.__check_new_loan(value, pending_ids, returned_ids)
+                    pending_ids.add(value.get_book_id())
+                else:
+                    self.__check_return(value, pending_ids, returned_ids)
+                    pending_ids.discard(value)
+                    returned_ids.add(value)
+
+            applied: list[tuple[str, Loan]] = list()
+
+            try:
+                for operation, value in operations:
+                    if operation == LoanBatch.LOAN:
+                        self.__engine.insert_loan(value)
+                        applied.append((operation, value))
+                    else:
+                        loan: Loan = self.__engine.get_loan(value)
+                        self.__engine.delete_loan(value)
+                        applied.append((operation, loan))
+            except Exception:
+                for operation, loan in reversed(applied):
+                    if operation == LoanBatch.LOAN:
+                        self.__engine.delete_loan(loan.get_book_id())
+                    else:
+                        self.__engine.insert_loan(loan)
+
+                # The undo leaves nothing to save, only the engine has to settle its records.
+                self.__engine.commit()
+                raise
+
+            self.__claim_reservations(value for operation, value in operations if operation == LoanBatch.LOAN)
+
+            # Books the batch left free go to their next holders once the whole batch is in.
+            for book_id in returned_ids:
+                if not self.__engine.has_loan(book_id):
+                    self.__hand_off(book_id)
+
+            self.__commit()
+            self.__record_history(loan for operation, loan in applied if operation == LoanBatch.RETURN)
+
+        self.save()
+
+    def __expire_reservations(self, as_of: datetime.datetime) -> tuple[Reservation]:
+        expired: tuple[Reservation] = self.__engine.get_expired_reservations(as_of)
+
+        for reservation in expired:
+            self.__engine.delete_reservation(reservation.get_customer_id(), reservation.get_book_id())
+
+        return expired
+
+    def __hand_off(self, book_id: int) -> None:
+        # The next holder gets the book right away, for the longest time its type allows.
+        self.__expire_reservations(datetime.datetime.now())
+        reservation: Reservation | None = self.__engine.get_first_reservation(book_id)
+
+        if reservation is None:
+            return
+
+        loan_date: datetime.date = datetime.date.today()
+        self.__engine.delete_reservation(reservation.get_customer_id(), book_id)
+
+        temp_book_max_loan_time: datetime.timedelta = self.__engine.get_book(book_id).get_max_loan_time()
+        self.__engine.insert_loan(Loan(reservation.get_customer_id(), book_id,
+                                    loan_date, loan_date + temp_book_max_loan_time))
+
+    def __check_new_reservation(self, reservation: Reservation) -> None:
+        customer_id: int = reservation.get_customer_id()
+        book_id: int = reservation.get_book_id()
+
+        if not self.__foreign_customers and not self.__is_customer_exists(customer_id):
+            raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
+
+        if not self.__is_book_exists(book_id):
+            raise BookException(f"Book (ID: {book_id}) does not exists.")
+
+        # A free book is loaned right away, only loaned ones have a queue.
         if not self.is_book_loaned(book_id):
-            raise LoanException(f"Book (ID: {book_id}) is not loaned.")
-        
-        return self.__loans[book_id]
-        
+            raise ReservationException(f"Book (ID: {book_id}) is not loaned.")
+
+        if self.__engine.get_loan(book_id).get_customer_id() == customer_id:
+            raise ReservationException(f"Book (ID: {book_id}) is already loaned by customer (ID: {customer_id}).")
+
+        if self.__engine.has_reservation(customer_id, book_id):
+            raise ReservationException(f"Book (ID: {book_id}) is already reserved by customer (ID: {customer_id}).")
+
+        if to_datetime(reservation.get_expiration_date()) <= reservation.get_reservation_date():
+            raise ReservationException("Reservation expiration date can not be earlier than reservation date.")
+
+    def reserve_book(self, customer_id: int, book_id: int,
+                    expiration_date: datetime.date | None = None) -> None:
+
+        with self.__lock.write():
+            reservation_date: datetime.datetime = datetime.datetime.now()
+
+            if expiration_date is None:
+                expiration_date = reservation_date + self.RESERVATION_TIME
+
+            reservation: Reservation = Reservation(customer_id, book_id, reservation_date, expiration_date)
+            self.__expire_reservations(reservation_date)
+            self.__check_new_reservation(reservation)
+
+            self.__engine.insert_reservation(reservation)
+            self.__commit()
+
+    def cancel_reservation(self, customer_id: int, book_id: int) -> None:
+        with self.__lock.write():
+            if not self.__engine.has_reservation(customer_id, book_id):
+                raise ReservationException(f"Book (ID: {book_id}) is not reserved by customer (ID: {customer_id}).")
+
+            self.__engine.delete_reservation(customer_id, book_id)
+            self.__commit()
+
+    @staticmethod
+    def __filter_expired(reservations: tuple[Reservation]) -> tuple[Reservation]:
+        # Readers leave the expired reservations for the next writer to drop.
+        as_of: datetime.datetime = datetime.datetime.now()
+
+        return tuple(i for i in reservations if to_datetime(i.get_expiration_date()) > as_of)
+
+    def get_book_reservations(self, book_id: int) -> tuple[Reservation]:
+        with self.__lock.read():
+            if not self.__is_book_exists(book_id):
+                raise BookException(f"Book (ID: {book_id}) does not exists.")
+
+            return self.__filter_expired(self.__engine.get_book_reservations(book_id))
+
+    def get_customer_reservations(self, customer_id: int) -> tuple[Reservation]:
+        with self.__lock.read():
+            if not self.__foreign_customers and not self.__is_customer_exists(customer_id):
+                raise CustomerException(f"Customer (ID: {customer_id}) does not exists.")
+
+            return self.__filter_expired(self.__engine.get_customer_reservations(customer_id))
+
+    def expire_reservations(self, as_of: datetime.date | None = None) -> tuple[Reservation]:
+        with self.__lock.write():
+            if as_of is None:
+                as_of = datetime.datetime.now()
+
+            expired: tuple[Reservation] = self.__expire_reservations(to_datetime(as_of))
+
+            if expired:
+                self.__commit()
+
+            return expired
+
+    def get_loan(self, book_id: int) -> Loan:
+        with self.__lock.read():
+            if not self.is_book_loaned(book_id):
+                raise LoanException(f"Book (ID: {book_id}) is not loaned.")
+
+            return self.__engine.get_loan(book_id)
+
     def get_all_loans(self) -> tuple[Loan]:
-        return tuple(self.__loans.values())
-    
-    def get_all_late_loans(self) -> tuple[Loan]:
-        return tuple(i for i in self.__loans.values() if datetime.datetime.now() > i.get_return_date())
\ No newline at end of file
+        with self.__lock.read():
+            return self.__engine.get_all_loans()
+
+    def iter_loans(self, offset: int = 0, limit: int | None = None) -> Iterator[Loan]:
+        with self.__lock.read():
+            return self.__detach(self.__engine.iter_loans(offset, limit))
+
+    def get_all_late_loans(self, as_of: datetime.date | None = None) -> tuple[Loan]:
+        with self.__lock.read():
+            if as_of is None:
+                as_of = datetime.datetime.now()
+
+            return self.__engine.get_loans_by_return_date(upper=to_datetime(as_of))
+
+    def get_loans_due_between(self, start_date: datetime.date,
+                            end_date: datetime.date) -> tuple[Loan]:
+
+        upper: datetime.datetime = to_datetime(end_date)
+        include_upper: bool = True
+
+        # A date without a time covers its whole day, so the range runs up to the next midnight.
+        if not isinstance(end_date, datetime.datetime):
+            upper += datetime.timedelta(days=1)
+            include_upper = False
+
+        with self.__lock.read():
+            return self.__engine.get_loans_by_return_date(to_datetime(start_date), upper, include_upper=include_upper)
+
+    @staticmethod
+    def __check_query_fields(predicate: Predicate, fields: frozenset[str], entity_name: str) -> None:
+        unknown_fields: frozenset[str] = predicate.get_fields() - fields
+
+        if unknown_fields:
+            raise LibraryException(f"Unknown {entity_name} field(s): {', '.join(sorted(unknown_fields))}.")
+
+    def query_books(self, predicate: Predicate) -> tuple[Book]:
+        self.__check_query_fields(predicate, BOOK_FIELDS, "book")
+
+        with self.__lock.read():
+            return self.__engine.query_books(predicate)
+
+    def query_loans(self, predicate: Predicate) -> tuple[Loan]:
+        self.__check_query_fields(predicate, LOAN_FIELDS, "loan")
+
+        with self.__lock.read():
+            return self.__engine.query_loans(predicate)
+
+    def get_loan_history(self, customer_id: int | None = None, book_id: int | None = None,
+                        start_date: datetime.date | None = None,
+                        end_date: datetime.date | None = None) -> tuple[LoanHistoryEntry]:
+
+        if self.__history is None:
+            raise LibraryException("Loan history is not enabled for this library.")
+
+        with self.__lock.read():
+            return self.__history.get_loans(customer_id, book_id, start_date, end_date)
+
+    def __import(self, rows: Iterable[Mapping[str, Any]], batch_size: int,
+                parse_row: Callable[[Mapping[str, Any]], Any],
+                check_record: Callable[[Any, set[int]], None],
+                get_record_id: Callable[[Any], int],
+                insert_records: Callable[[list], None]) -> ImportReport:
+
+        report: ImportReport = ImportReport()
+        batch: list[tuple[int, Any]] = list()
+
+        def flush_batch() -> None:
+            records: list = list()
+            pending_ids: set[int] = set()
+
+            with self.__lock.write():
+                for row_number, record in batch:
+                    try:
+                        check_record(record, pending_ids)
+                    except LibraryException as error:
+                        report.add_error(row_number, error)
+                        continue
+
+                    records.append(record)
+                    pending_ids.add(get_record_id(record))
+
+                if records:
+                    insert_records(records)
+                    self.__commit()
+
+            report.add_imported(len(records))
+            batch.clear()
+
+        for row_number, row in enumerate(rows, 1):
+            try:
+                batch.append((row_number, parse_row(row)))
+            except LibraryException as error:
+                report.add_error(row_number, error)
+                continue
+
+            if len(batch) >= batch_size:
+                flush_batch()
+
+        flush_batch()
+        self.save()
+
+        return report
+
+    def import_customers(self, rows: Iterable[Mapping[str, Any]],
+                        batch_size: int = IMPORT_BATCH_SIZE) -> ImportReport:
+
+        return self.__import(rows, batch_size, parse_customer_row, self.__check_new_customer,
+                            Customer.get_id, self.__engine.insert_customers)
+
+    def __insert_books(self, books: list[Book]) -> None:
+        self.__engine.insert_books(books)
+
+        if self.__search_index is not None:
+            self.__search_index.add_books(books)
+
+    def import_books(self, rows: Iterable[Mapping[str, Any]],
+                    batch_size: int = IMPORT_BATCH_SIZE) -> ImportReport:
+
+        return self.__import(rows, batch_size, parse_book_row, self.__check_new_book,
+                            Book.get_id, self.__insert_books)
+
+    def __insert_loans(self, loans: list[Loan]) -> None:
+        self.__engine.insert_loans(loans)
+        self.__claim_reservations(loans)
+
+    def import_loans(self, rows: Iterable[Mapping[str, Any]],
+                    batch_size: int = IMPORT_BATCH_SIZE) -> ImportReport:
+
+        return self.__import(rows, batch_size, parse_loan_row, self.__check_new_loan,
+                            Loan.get_book_id, self.__insert_loans)
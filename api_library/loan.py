@@ -1,6 +1,14 @@
 from datetime import date
+from api_library.record import Record
+
+class Loan(Record):
+    __slots__ = (
+        "__customer_id",
+        "__book_id",
+        "__loan_date",
+        "__return_date"
+    )
 
-class Loan:
     def __init__(self, customer_id: int, book_id: int, loan_date: date, 
                 return_date: date) -> None:
         
@@ -0,0 +1,23 @@
+import datetime
+from api_library.loan import Loan
+
+class LoanBatch:
+    LOAN: str = "loan"
+    RETURN: str = "return"
+
+    def __init__(self) -> None:
+        self.__operations: list[tuple[str, Loan | int]] = list()
+
+    def loan_book(self, customer_id: int, book_id: int, loan_date: datetime.date,
+                return_date: datetime.date) -> None:
+
+        self.__operations.append((self.LOAN, Loan(customer_id, book_id, loan_date, return_date)))
+
+    def return_book(self, book_id: int) -> None:
+        self.__operations.append((self.RETURN, book_id))
+
+    def get_operations(self) -> tuple[tuple[str, Loan | int]]:
+        return tuple(self.__operations)
+
+    def __len__(self) -> int:
+        return len(self.__operations)
@@ -0,0 +1,105 @@
+import threading
+import contextlib
+from typing import ContextManager, Iterator
+
+class ReadWriteLock:
+    def __init__(self) -> None:
+        self.__condition: threading.Condition = threading.Condition(threading.Lock())
+        self.__readers_count: int = 0
+        self.__waiting_writers_count: int = 0
+        self.__writer: int | None = None
+        self.__writer_depth: int = 0
+        self.__local: threading.local = threading.local()
+
+    def acquire_read(self) -> None:
+        thread_id: int = threading.get_ident()
+        read_depth: int = getattr(self.__local, "read_depth", 0)
+
+        with self.__condition:
+            # Reads nested inside a write of the same thread count as part of the write.
+            if self.__writer == thread_id:
+                self.__writer_depth += 1
+                return
+
+            if not read_depth:
+                while self.__writer is not None or self.__waiting_writers_count:
+                    self.__condition.wait()
+
+                self.__readers_count += 1
+
+        self.__local.read_depth = read_depth + 1
+
+    def release_read(self) -> None:
+        with self.__condition:
+            if self.__writer == threading.get_ident():
+                self.__writer_depth -= 1
+                return
+
+            self.__local.read_depth -= 1
+
+            if self.__local.read_depth:
+                return
+
+            self.__readers_count -= 1
+
+            if not self.__readers_count:
+                self.__condition.notify_all()
+
+    def acquire_write(self) -> None:
+        thread_id: int = threading.get_ident()
+
+        with self.__condition:
+            if self.__writer == thread_id:
+                self.__writer_depth += 1
+                return
+
+            if getattr(self.__local, "read_depth", 0):
+                raise RuntimeError("A read lock can not be upgraded to a write lock.")
+
+            self.__waiting_writers_count += 1
+
+            try:
+                while self.__writer is not None or self.__readers_count:
+                    self.__condition.wait()
+            finally:
+                self.__waiting_writers_count -= 1
+
+            self.__writer = thread_id
+            self.__writer_depth = 1
+
+    def release_write(self) -> None:
+        with self.__condition:
+            self.__writer_depth -= 1
+
+            if self.__writer_depth:
+                return
+
+            self.__writer = None
+            self.__condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class NullLock:
+    __CONTEXT: ContextManager[None] = contextlib.nullcontext()
+
+    def read(self) -> ContextManager[None]:
+        return self.__CONTEXT
+
+    def write(self) -> ContextManager[None]:
+        return self.__CONTEXT
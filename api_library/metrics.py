@@ -0,0 +1,135 @@
+import bisect
+import threading
+from typing import Any
+
+class LatencyHistogram:
+    # Upper bounds of the buckets in microseconds, on a 1-2-5 scale up to 10 seconds.
+    BUCKET_BOUNDS_US: tuple[int] = tuple(
+        base * 10 ** exponent for exponent in range(8) for base in (1, 2, 5)
+    )[:-2]
+
+    def __init__(self) -> None:
+        self.__bounds_ns: tuple[int] = tuple(i * 1000 for i in self.BUCKET_BOUNDS_US)
+        self.__counts: list[int] = [0] * (len(self.__bounds_ns) + 1)
+        self.__total_ns: int = 0
+        self.__max_ns: int = 0
+
+    def add(self, elapsed_ns: int) -> None:
+        self.__counts[bisect.bisect_left(self.__bounds_ns, elapsed_ns)] += 1
+        self.__total_ns += elapsed_ns
+
+        if elapsed_ns > self.__max_ns:
+            self.__max_ns = elapsed_ns
+
+    def get_count(self) -> int:
+        return sum(self.__counts)
+
+    def get_mean_ms(self) -> float:
+        count: int = self.get_count()
+
+        return self.__total_ns / count / 1_000_000 if count else 0.0
+
+    def get_max_ms(self) -> float:
+        return self.__max_ns / 1_000_000
+
+    def get_percentile_ms(self, percentile: float) -> float:
+        # Reported as the upper bound of the bucket holding the percentile.
+        count: int = self.get_count()
+        rank: float = percentile * count
+        seen: int = 0
+
+        for i, bucket_count in enumerate(self.__counts):
+            seen += bucket_count
+
+            if bucket_count and seen >= rank:
+                if i == len(self.__bounds_ns):
+                    return self.get_max_ms()
+
+                return min(self.__bounds_ns[i], self.__max_ns) / 1_000_000
+
+        return 0.0
+
+    def get_buckets(self) -> dict[str, int]:
+        temp_buckets: dict[str, int] = dict()
+
+        for bound, bucket_count in zip(self.BUCKET_BOUNDS_US + ("inf",), self.__counts):
+            if bucket_count:
+                temp_buckets[f"le_{bound}us"] = bucket_count
+
+        return temp_buckets
+
+class OperationMetrics:
+    def __init__(self) -> None:
+        self.__calls_count: int = 0
+        self.__errors: dict[str, int] = dict()
+        self.__histogram: LatencyHistogram = LatencyHistogram()
+
+    def add(self, elapsed_ns: int, error: BaseException | None = None) -> None:
+        self.__calls_count += 1
+        self.__histogram.add(elapsed_ns)
+
+        if error is not None:
+            error_name: str = type(error).__name__
+            self.__errors[error_name] = self.__errors.get(error_name, 0) + 1
+
+    def get_calls_count(self) -> int:
+        return self.__calls_count
+
+    def get_errors(self) -> dict[str, int]:
+        return dict(self.__errors)
+
+    def get_histogram(self) -> LatencyHistogram:
+        return self.__histogram
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.__calls_count,
+            "errors": self.get_errors(),
+            "mean_ms": self.__histogram.get_mean_ms(),
+            "p50_ms": self.__histogram.get_percentile_ms(0.50),
+            "p99_ms": self.__histogram.get_percentile_ms(0.99),
+            "max_ms": self.__histogram.get_max_ms(),
+            "buckets": self.__histogram.get_buckets()
+        }
+
+class LibraryMetrics:
+    def __init__(self) -> None:
+        self.__operations: dict[str, OperationMetrics] = dict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def record(self, operation: str, elapsed_ns: int, error: BaseException | None = None) -> None:
+        with self.__lock:
+            temp_metrics: OperationMetrics | None = self.__operations.get(operation)
+
+            if temp_metrics is None:
+                temp_metrics = self.__operations[operation] = OperationMetrics()
+
+            temp_metrics.add(elapsed_ns, error)
+
+    def get_operation(self, operation: str) -> OperationMetrics | None:
+        return self.__operations.get(operation)
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__operations.clear()
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        with self.__lock:
+            return {name: metrics.to_dict() for name, metrics in sorted(self.__operations.items())}
+
+    def get_report(self) -> str:
+        temp_lines: list[str] = [
+            f"{'Operation':<24}{'Calls':>9}{'Errors':>8}{'Mean ms':>11}{'p50 ms':>11}{'p99 ms':>11}{'Max ms':>11}"
+        ]
+
+        for name, metrics in self.to_dict().items():
+            temp_lines.append(
+                f"{name:<24}{metrics['calls']:>9}{sum(metrics['errors'].values()):>8}"
+                f"{metrics['mean_ms']:>11.3f}{metrics['p50_ms']:>11.3f}"
+                f"{metrics['p99_ms']:>11.3f}{metrics['max_ms']:>11.3f}"
+            )
+
+            for error_name, error_count in sorted(metrics["errors"].items()):
+                temp_lines.append(f"    {error_name}: {error_count}")
+
+        return "\n".join(temp_lines)
@@ -0,0 +1,181 @@
+import operator
+import datetime
+from abc import ABC, abstractmethod
+from typing import Any, Hashable, Iterable
+from api_library.utils import to_datetime
+from api_library.exceptions import LibraryException
+
+BOOK_FIELDS: frozenset[str] = frozenset(("id", "type", "name", "author", "date_published"))
+LOAN_FIELDS: frozenset[str] = frozenset(("book_id", "customer_id", "loan_date", "return_date"))
+DATE_FIELDS: frozenset[str] = frozenset(("date_published", "loan_date", "return_date"))
+
+class Predicate(ABC):
+    @abstractmethod
+    def matches(self, record: Any) -> bool:
+        pass
+
+    @abstractmethod
+    def get_fields(self) -> frozenset[str]:
+        pass
+
+    def get_conjuncts(self) -> tuple["Predicate"]:
+        return (self,)
+
+    def __and__(self, other: "Predicate") -> "And":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Or":
+        return Or(self, other)
+
+class FieldPredicate(Predicate):
+    def __init__(self, field: str) -> None:
+        self.__field: str = field
+        self.__getter: operator.methodcaller = operator.methodcaller(f"get_{field}")
+
+    def get_field(self) -> str:
+        return self.__field
+
+    def get_fields(self) -> frozenset[str]:
+        return frozenset((self.__field,))
+
+    def _get_value(self, record: Any) -> Any:
+        value: Any = self.__getter(record)
+
+        # Dates and datetimes do not compare, dates are matched as their midnight.
+        if self.__field in DATE_FIELDS:
+            return to_datetime(value)
+
+        return value
+
+    def _normalize(self, value: Any) -> Any:
+        if value is not None and self.__field in DATE_FIELDS:
+            if not isinstance(value, datetime.date):
+                raise LibraryException(f"Query value for '{self.__field}' must be a date ({value!r}).")
+
+            return to_datetime(value)
+
+        return value
+
+    def _is_whole_day(self, value: Any) -> bool:
+        # A date without a time on a date field covers its whole day.
+        return (self.__field in DATE_FIELDS and isinstance(value, datetime.date)
+                and not isinstance(value, datetime.datetime))
+
+    def _normalize_range(self, value: Any) -> tuple[Any, Any, bool]:
+        if self._is_whole_day(value):
+            return to_datetime(value), to_datetime(value + datetime.timedelta(days=1)), False
+
+        value = self._normalize(value)
+
+        return value, value, True
+
+    @abstractmethod
+    def get_values(self) -> tuple[Hashable] | None:
+        # Exact keys for hash index lookups, None when the predicate is a range.
+        pass
+
+    @abstractmethod
+    def get_ranges(self) -> tuple[tuple[Any, Any, bool]]:
+        # (lower, upper, include_upper) ranges for sorted index lookups.
+        pass
+
+class Equals(FieldPredicate):
+    def __init__(self, field: str, value: Any) -> None:
+        super().__init__(field)
+        self.__range: tuple[Any, Any, bool] = self._normalize_range(value)
+
+    def matches(self, record: Any) -> bool:
+        lower, upper, include_upper = self.__range
+        value: Any = self._get_value(record)
+
+        if include_upper:
+            return value == lower
+
+        return lower <= value < upper
+
+    def get_values(self) -> tuple[Hashable] | None:
+        # A whole day is a range of datetimes, it can not be looked up as a single key.
+        if not self.__range[2]:
+            return None
+
+        return (self.__range[0],)
+
+    def get_ranges(self) -> tuple[tuple[Any, Any, bool]]:
+        return (self.__range,)
+
+class In(FieldPredicate):
+    def __init__(self, field: str, values: Iterable[Any]) -> None:
+        super().__init__(field)
+        self.__ranges: tuple[tuple[Any, Any, bool]] = tuple(dict.fromkeys(self._normalize_range(i) for i in values))
+        self.__values_set: frozenset = frozenset(i[0] for i in self.__ranges if i[2])
+        self.__day_ranges: tuple[tuple[Any, Any, bool]] = tuple(i for i in self.__ranges if not i[2])
+
+    def matches(self, record: Any) -> bool:
+        value: Any = self._get_value(record)
+
+        return value in self.__values_set or any(i[0] <= value < i[1] for i in self.__day_ranges)
+
+    def get_values(self) -> tuple[Hashable] | None:
+        if self.__day_ranges:
+            return None
+
+        return tuple(i[0] for i in self.__ranges)
+
+    def get_ranges(self) -> tuple[tuple[Any, Any, bool]]:
+        return self.__ranges
+
+class Between(FieldPredicate):
+    def __init__(self, field: str, lower: Any = None, upper: Any = None,
+                include_upper: bool = True) -> None:
+
+        super().__init__(field)
+
+        # A whole day upper bound runs up to the next midnight.
+        if include_upper and self._is_whole_day(upper):
+            upper += datetime.timedelta(days=1)
+            include_upper = False
+
+        self.__lower: Any = self._normalize(lower)
+        self.__upper: Any = self._normalize(upper)
+        self.__include_upper: bool = include_upper
+
+    def matches(self, record: Any) -> bool:
+        value: Any = self._get_value(record)
+
+        if self.__lower is not None and value < self.__lower:
+            return False
+
+        if self.__upper is not None:
+            return value <= self.__upper if self.__include_upper else value < self.__upper
+
+        return True
+
+    def get_values(self) -> None:
+        return None
+
+    def get_ranges(self) -> tuple[tuple[Any, Any, bool]]:
+        return ((self.__lower, self.__upper, self.__include_upper),)
+
+class And(Predicate):
+    def __init__(self, *predicates: Predicate) -> None:
+        self.__predicates: tuple[Predicate] = tuple(
+            conjunct for predicate in predicates for conjunct in predicate.get_conjuncts())
+
+    def matches(self, record: Any) -> bool:
+        return all(i.matches(record) for i in self.__predicates)
+
+    def get_fields(self) -> frozenset[str]:
+        return frozenset().union(*(i.get_fields() for i in self.__predicates))
+
+    def get_conjuncts(self) -> tuple[Predicate]:
+        return self.__predicates
+
+class Or(Predicate):
+    def __init__(self, *predicates: Predicate) -> None:
+        self.__predicates: tuple[Predicate] = predicates
+
+    def matches(self, record: Any) -> bool:
+        return any(i.matches(record) for i in self.__predicates)
+
+    def get_fields(self) -> frozenset[str]:
+        return frozenset().union(*(i.get_fields() for i in self.__predicates))
@@ -0,0 +1,27 @@
+from typing import Any
+
+class Record:
+    __slots__ = ()
+    _fields: tuple[str] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        temp_class_name: str = cls.__name__.lstrip("_")
+        cls._fields = tuple(
+            f"_{temp_class_name}{i}" if i.startswith("__") else i
+            for i in cls.__dict__.get("__slots__", ())
+        )
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, i) for i in self._fields)
+
+    def __setstate__(self, state: tuple | dict) -> None:
+        # Pickles written before the records were slotted carry the instance __dict__.
+        if isinstance(state, dict):
+            for name, value in state.items():
+                setattr(self, name, value)
+            return
+
+        for name, value in zip(self._fields, state):
+            setattr(self, name, value)
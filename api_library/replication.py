@@ -0,0 +1,148 @@
+import os
+import time
+import threading
+from typing import Any, Callable
+from api_library.library import Library
+from api_library.journal import Journal
+from api_library.storage.storage_type import StorageType
+from api_library.exceptions import LibraryException
+
+class LibraryReplica:
+    READ_METHODS: frozenset[str] = frozenset((
+        "get_customer_by_id",
+        "get_customer_by_name",
+        "get_customer_loans",
+        "get_all_customers",
+        "iter_customers",
+        "get_book_by_id",
+        "get_books_by_name",
+        "get_books_by_author",
+        "get_all_books",
+        "iter_books",
+        "iter_books_by_name",
+        "iter_books_by_author",
+        "search_books",
+        "is_book_loaned",
+        "get_loan",
+        "get_all_loans",
+        "iter_loans",
+        "get_all_late_loans",
+        "get_loans_due_between",
+        "get_book_reservations",
+        "get_customer_reservations",
+        "query_books",
+        "query_loans"
+    ))
+
+    def __init__(self, file_database: str, storage_type: StorageType = StorageType.PICKLE,
+                poll_interval: float = 0.1, max_staleness: float | None = None) -> None:
+
+        # The primary has to run with journaling, its journal is the shipped mutation log.
+        if storage_type == StorageType.SQLITE:
+            raise LibraryException("SQLite libraries can not be replicated from their journal.")
+
+        file_snapshot: str = f"{file_database}.{storage_type.get_engine_type()._FILE_EXTENSION}"
+
+        if not os.path.exists(file_snapshot):
+            raise LibraryException(f"Library snapshot '{file_snapshot}' does not exist yet.")
+
+        self.__file_database: str = file_database
+        self.__storage_type: StorageType = storage_type
+        self.__poll_interval: float = poll_interval
+        self.__max_staleness: float | None = max_staleness
+        self.__journal: Journal = Journal(f"{file_database}.journal")
+        self.__catch_up_lock: threading.Lock = threading.Lock()
+        self.__library: Library | None = None
+        self.__journal_position: int = 0
+        self.__journal_id: int | None = None
+        self.__synced_at: float = 0.0
+        self.__stopped: threading.Event = threading.Event()
+
+        self.__reload()
+        self.catch_up()
+
+        self.__thread: threading.Thread = threading.Thread(
+            target=self.__run, name="library-replica", daemon=True)
+        self.__thread.start()
+
+    def __get_journal_id(self) -> int | None:
+        try:
+            return os.stat(f"{self.__file_database}.journal").st_ino
+        except FileNotFoundError:
+            return None
+
+    def __reload(self) -> None:
+        # The journal is noted first, a file replaced while the snapshot loads then shows up as new.
+        self.__journal_id = self.__get_journal_id()
+        self.__journal_position = 0
+
+        # The replica never saves, so its copy of the primary files is left untouched.
+        self.__library = Library(self.__file_database, storage_type=self.__storage_type, thread_safe=True)
+
+    def __apply(self, records: list[tuple[int, list[tuple[str, tuple]]]]) -> int:
+        applied_count: int = 0
+
+        for sequence, group in records:
+            applied_count += self.__library.apply_replicated_records(sequence, group)
+
+        return applied_count
+
+    def catch_up(self) -> int:
+        with self.__catch_up_lock:
+            started_at: float = time.monotonic()
+            records, position, journal_id = self.__journal.read_from(self.__journal_position)
+            applied_count: int | None = None
+
+            # A compacted or autosaved primary writes a fresh snapshot, then starts a new journal file.
+            if journal_id is None or journal_id == self.__journal_id:
+                try:
+                    applied_count = self.__apply(records)
+                except LibraryException:
+                    # Records between the loaded snapshot and the journal are missing.
+                    pass
+
+            # A journal replaced again while the snapshot loads is left for the next poll.
+            if applied_count is None:
+                self.__reload()
+                records, position, journal_id = self.__journal.read_from(0)
+
+                if journal_id is not None and journal_id != self.__journal_id:
+                    raise LibraryException("Library journal was truncated while its snapshot was loading.")
+
+                applied_count = self.__apply(records)
+
+            self.__journal_position = position
+            self.__journal_id = journal_id
+            self.__synced_at = started_at
+
+            return applied_count
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.__poll_interval):
+            try:
+                self.catch_up()
+            except LibraryException:
+                # Retried on the next poll, the staleness bound covers the reads meanwhile.
+                continue
+
+    def get_sequence(self) -> int:
+        return self.__library.get_sequence()
+
+    def get_staleness(self) -> float:
+        return time.monotonic() - self.__synced_at
+
+    def close(self) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name not in self.READ_METHODS:
+            raise AttributeError(f"Library replicas are read only, '{name}' is not available.")
+
+        def read(*args, **kwargs) -> Any:
+            if self.__max_staleness is not None and self.get_staleness() > self.__max_staleness:
+                self.catch_up()
+
+            return getattr(self.__library, name)(*args, **kwargs)
+
+        return read
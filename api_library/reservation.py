@@ -0,0 +1,30 @@
+from datetime import date
+from api_library.record import Record
+
+class Reservation(Record):
+    __slots__ = (
+        "__customer_id",
+        "__book_id",
+        "__reservation_date",
+        "__expiration_date"
+    )
+
+    def __init__(self, customer_id: int, book_id: int, reservation_date: date,
+                expiration_date: date) -> None:
+
+        self.__customer_id: int = customer_id
+        self.__book_id: int = book_id
+        self.__reservation_date: date = reservation_date
+        self.__expiration_date: date = expiration_date
+
+    def get_customer_id(self) -> int:
+        return self.__customer_id
+
+    def get_book_id(self) -> int:
+        return self.__book_id
+
+    def get_reservation_date(self) -> date:
+        return self.__reservation_date
+
+    def get_expiration_date(self) -> date:
+        return self.__expiration_date
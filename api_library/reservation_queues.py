@@ -0,0 +1,57 @@
+import datetime
+from typing import Iterable
+from api_library.reservation import Reservation
+from api_library.index import HashIndex, SortedIndex
+from api_library.utils import to_datetime
+
+class ReservationQueues:
+    def __init__(self, reservations: Iterable[Reservation] = ()) -> None:
+        self.__reservations: dict[tuple[int, int], Reservation] = dict()
+        # A HashIndex keeps its ids in insertion order, so the first one of a book is next in line.
+        self.__queues: HashIndex = HashIndex()
+        self.__customer_books: HashIndex = HashIndex()
+        self.__expirations: SortedIndex = SortedIndex()
+
+        for reservation in reservations:
+            self.add(reservation)
+
+    def get_all(self) -> tuple[Reservation]:
+        # Reservations were added in queue order, loading them back in this order keeps the queues.
+        return tuple(self.__reservations.values())
+
+    def has(self, customer_id: int, book_id: int) -> bool:
+        return (book_id, customer_id) in self.__reservations
+
+    def add(self, reservation: Reservation) -> None:
+        book_id: int = reservation.get_book_id()
+        customer_id: int = reservation.get_customer_id()
+
+        self.__reservations[(book_id, customer_id)] = reservation
+        self.__queues.add(book_id, customer_id)
+        self.__customer_books.add(customer_id, book_id)
+        self.__expirations.add(to_datetime(reservation.get_expiration_date()), (book_id, customer_id))
+
+    def remove(self, customer_id: int, book_id: int) -> Reservation:
+        reservation: Reservation = self.__reservations.pop((book_id, customer_id))
+        self.__queues.remove(book_id, customer_id)
+        self.__customer_books.remove(customer_id, book_id)
+        self.__expirations.remove(to_datetime(reservation.get_expiration_date()), (book_id, customer_id))
+
+        return reservation
+
+    def get_book_reservations(self, book_id: int) -> tuple[Reservation]:
+        return tuple(self.__reservations[(book_id, i)] for i in self.__queues.iter(book_id))
+
+    def get_first(self, book_id: int) -> Reservation | None:
+        customer_id: int | None = self.__queues.get_first(book_id)
+
+        if customer_id is None:
+            return None
+
+        return self.__reservations[(book_id, customer_id)]
+
+    def get_customer_reservations(self, customer_id: int) -> tuple[Reservation]:
+        return tuple(self.__reservations[(i, customer_id)] for i in self.__customer_books.iter(customer_id))
+
+    def get_expired(self, as_of: datetime.datetime) -> tuple[Reservation]:
+        return tuple(self.__reservations[i] for i in self.__expirations.get_range(upper=as_of, include_upper=True))
@@ -0,0 +1,252 @@
+import re
+import heapq
+import bisect
+import itertools
+import unicodedata
+from typing import Iterable, Iterator
+from api_library.book.book import Book
+
+class BookSearchIndex:
+    TITLE_WEIGHT: float = 1.0
+    AUTHOR_WEIGHT: float = 0.8
+    FUZZY_MIN_SIMILARITY: float = 0.4
+    MAX_EXPANDED_TOKENS: int = 50
+    __TOKEN_PATTERN: re.Pattern = re.compile(r"\w+")
+
+    def __init__(self) -> None:
+        # Postings keep their book ids sorted, so the lowest ids of a tie can be taken without reading the rest.
+        self.__title_tokens: dict[str, list[int]] = dict()
+        self.__author_tokens: dict[str, list[int]] = dict()
+        # Tokens are sorted per length, a prefix then expands to its shortest and best scored tokens first.
+        self.__sorted_tokens: dict[int, list[str]] = dict()
+        self.__trigram_tokens: dict[str, set[str]] = dict()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        if text.isascii():
+            return text.casefold()
+
+        decomposed: str = unicodedata.normalize("NFKD", text)
+        stripped: str = "".join(i for i in decomposed if not unicodedata.combining(i))
+
+        return stripped.casefold()
+
+    @classmethod
+    def tokenize(cls, text: str) -> list[str]:
+        return cls.__TOKEN_PATTERN.findall(cls.normalize(text))
+
+    @staticmethod
+    def __get_trigrams(token: str) -> set[str]:
+        padded_token: str = f"  {token} "
+
+        return {padded_token[i:i + 3] for i in range(len(padded_token) - 2)}
+
+    def __has_token(self, token: str) -> bool:
+        return token in self.__title_tokens or token in self.__author_tokens
+
+    def __add_token(self, token: str) -> None:
+        self.__sorted_tokens.setdefault(len(token), list()).append(token)
+
+        for trigram in self.__get_trigrams(token):
+            self.__trigram_tokens.setdefault(trigram, set()).add(token)
+
+    def __remove_token(self, token: str) -> None:
+        temp_sorted_tokens: list[str] = self.__sorted_tokens[len(token)]
+        del temp_sorted_tokens[bisect.bisect_left(temp_sorted_tokens, token)]
+
+        if not temp_sorted_tokens:
+            del self.__sorted_tokens[len(token)]
+
+        for trigram in self.__get_trigrams(token):
+            temp_tokens: set[str] = self.__trigram_tokens[trigram]
+            temp_tokens.discard(token)
+
+            if not temp_tokens:
+                del self.__trigram_tokens[trigram]
+
+    def add_book(self, book: Book) -> None:
+        self.add_books((book,))
+
+    def add_books(self, books: Iterable[Book]) -> None:
+        # Appending and sorting every touched list once is cheaper than keeping them sorted on each insert.
+        touched_postings: dict[int, list[int]] = dict()
+        new_tokens: list[str] = list()
+
+        for book in books:
+            book_id: int = book.get_id()
+
+            for tokens, field in ((self.tokenize(book.get_name()), self.__title_tokens),
+                                (self.tokenize(book.get_author()), self.__author_tokens)):
+
+                for token in set(tokens):
+                    if not self.__has_token(token):
+                        new_tokens.append(token)
+
+                    temp_book_ids: list[int] = field.setdefault(token, list())
+                    temp_book_ids.append(book_id)
+                    touched_postings[id(temp_book_ids)] = temp_book_ids
+
+        for book_ids in touched_postings.values():
+            book_ids.sort()
+
+        for token in new_tokens:
+            self.__add_token(token)
+
+        for length in {len(i) for i in new_tokens}:
+            self.__sorted_tokens[length].sort()
+
+    def remove_book(self, book: Book) -> None:
+        for tokens, field in ((self.tokenize(book.get_name()), self.__title_tokens),
+                            (self.tokenize(book.get_author()), self.__author_tokens)):
+
+            for token in set(tokens):
+                temp_book_ids: list[int] | None = field.get(token)
+
+                if temp_book_ids is None:
+                    continue
+
+                del temp_book_ids[bisect.bisect_left(temp_book_ids, book.get_id())]
+
+                if temp_book_ids:
+                    continue
+
+                del field[token]
+
+                if not self.__has_token(token):
+                    self.__remove_token(token)
+
+    def __iter_prefixed_tokens(self, prefix: str) -> Iterator[str]:
+        for length in sorted(i for i in self.__sorted_tokens if i >= len(prefix)):
+            temp_sorted_tokens: list[str] = self.__sorted_tokens[length]
+            position: int = bisect.bisect_left(temp_sorted_tokens, prefix)
+
+            while position < len(temp_sorted_tokens) and temp_sorted_tokens[position].startswith(prefix):
+                yield temp_sorted_tokens[position]
+                position += 1
+
+    def __get_matching_tokens(self, query_token: str, fuzzy: bool) -> dict[str, float]:
+        matches: dict[str, float] = dict()
+
+        for token in itertools.islice(self.__iter_prefixed_tokens(query_token), self.MAX_EXPANDED_TOKENS):
+            matches[token] = 1.0 if token == query_token else 0.5 + 0.4 * len(query_token) / len(token)
+
+        # Fuzzy matches score below every prefix match, a full expansion leaves no room for them.
+        if not fuzzy or len(query_token) < 3 or len(matches) >= self.MAX_EXPANDED_TOKENS:
+            return matches
+
+        query_trigrams: set[str] = self.__get_trigrams(query_token)
+        shared_counts: dict[str, int] = dict()
+
+        for trigram in query_trigrams:
+            for token in self.__trigram_tokens.get(trigram, ()):
+                shared_counts[token] = shared_counts.get(token, 0) + 1
+
+        similarities: dict[str, float] = dict()
+
+        for token, shared_count in shared_counts.items():
+            if token in matches:
+                continue
+
+            similarity: float = shared_count / (len(query_trigrams) + len(token) + 1 - shared_count)
+
+            if similarity >= self.FUZZY_MIN_SIMILARITY:
+                similarities[token] = similarity
+
+        for token in heapq.nsmallest(self.MAX_EXPANDED_TOKENS - len(matches), similarities,
+                                    key=lambda i: (-similarities[i], i)):
+
+            matches[token] = 0.5 * similarities[token]
+
+        return matches
+
+    def __get_ranked_postings(self, matches: dict[str, float]) -> list[tuple[float, list[int]]]:
+        postings: list[tuple[float, list[int]]] = list()
+
+        for token, score in matches.items():
+            for field, weight in ((self.__title_tokens, self.TITLE_WEIGHT),
+                                (self.__author_tokens, self.AUTHOR_WEIGHT)):
+
+                if token in field:
+                    postings.append((score * weight, field[token]))
+
+        postings.sort(key=lambda i: i[0], reverse=True)
+
+        return postings
+
+    @staticmethod
+    def __score_books(book_ids: set[int], score: float,
+                    other_postings: list[list[tuple[float, list[int]]]]) -> dict[int, float]:
+
+        book_scores: dict[int, float] = dict.fromkeys(book_ids, score)
+
+        for postings in other_postings:
+            # A book takes the best score of each other token, books that miss one of them drop out.
+            pending_ids: set[int] = set(book_scores)
+            token_scores: dict[int, float] = dict()
+
+            for token_score, token_book_ids in postings:
+                matched_ids: set[int] = pending_ids.intersection(token_book_ids)
+                pending_ids -= matched_ids
+
+                for book_id in matched_ids:
+                    token_scores[book_id] = book_scores[book_id] + token_score
+
+                if not pending_ids:
+                    break
+
+            book_scores = token_scores
+
+        return book_scores
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> list[int]:
+        query_matches: list[dict[str, float]] = [
+            self.__get_matching_tokens(i, fuzzy) for i in dict.fromkeys(self.tokenize(query))]
+
+        # Every query token has to match a book, the scores of the tokens add up.
+        if not query_matches or not all(query_matches) or limit <= 0:
+            return list()
+
+        ranked_postings: list[list[tuple[float, list[int]]]] = [self.__get_ranked_postings(i) for i in query_matches]
+        # The query token with the fewest postings picks the candidates, the other tokens only score them.
+        driver_postings: list[tuple[float, list[int]]] = ranked_postings.pop(
+            min(range(len(ranked_postings)), key=lambda i: sum(len(j) for _, j in ranked_postings[i])))
+        other_max_score: float = sum(i[0][0] for i in ranked_postings)
+
+        # The worst kept book sits on top of the heap, it is ranked by its score and then by the lowest id.
+        best_books: list[tuple[float, int]] = list()
+        seen_ids: set[int] = set()
+
+        for score, group in itertools.groupby(driver_postings, key=lambda i: i[0]):
+            # Postings come in falling score order, stop once none of the rest can outrank the kept books.
+            if len(best_books) == limit and best_books[0][0] > round(score + other_max_score, 9):
+                break
+
+            group_postings: list[list[int]] = [i for _, i in group]
+            book_scores: dict[int, float] = dict()
+
+            if ranked_postings:
+                group_ids: set[int] = set().union(*group_postings) - seen_ids
+                seen_ids |= group_ids
+                book_scores = self.__score_books(group_ids, score, ranked_postings)
+            else:
+                # With a single query token the whole group scores the same, its lowest ids are enough.
+                for book_id in heapq.merge(*group_postings):
+                    if book_id in seen_ids:
+                        continue
+
+                    seen_ids.add(book_id)
+                    book_scores[book_id] = score
+
+                    if len(book_scores) == limit:
+                        break
+
+            for book_id, book_score in book_scores.items():
+                # Adding the token scores in another order may change the last bits of an equal score.
+                book_score = round(book_score, 9)
+
+                if len(best_books) < limit:
+                    heapq.heappush(best_books, (book_score, -book_id))
+                elif (book_score, -book_id) > best_books[0]:
+                    heapq.heapreplace(best_books, (book_score, -book_id))
+
+        return [-i for _, i in sorted(best_books, reverse=True)]
@@ -0,0 +1,71 @@
+import datetime
+from typing import Any
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.loan import Loan
+from api_library.history import LoanHistoryEntry
+from api_library.reservation import Reservation
+
+def customer_to_row(customer: Customer) -> dict[str, Any]:
+    return {
+        "id": customer.get_id(),
+        "name": customer.get_name(),
+        "address": customer.get_address(),
+        "email": customer.get_email(),
+        "birth_date": customer.get_birth_date().isoformat()
+    }
+
+def book_to_row(book: Book) -> dict[str, Any]:
+    return {
+        "id": book.get_id(),
+        "type": int(book.get_type()),
+        "name": book.get_name(),
+        "author": book.get_author(),
+        "date_published": book.get_date_published().isoformat()
+    }
+
+def loan_to_row(loan: Loan) -> dict[str, Any]:
+    return {
+        "customer_id": loan.get_customer_id(),
+        "book_id": loan.get_book_id(),
+        "loan_date": loan.get_loan_date().isoformat(),
+        "return_date": loan.get_return_date().isoformat()
+    }
+
+def loan_history_entry_to_row(entry: LoanHistoryEntry) -> dict[str, Any]:
+    temp_row: dict[str, Any] = loan_to_row(entry.get_loan())
+    temp_row["closed_date"] = entry.get_closed_date().isoformat()
+
+    return temp_row
+
+def reservation_to_row(reservation: Reservation) -> dict[str, Any]:
+    return {
+        "customer_id": reservation.get_customer_id(),
+        "book_id": reservation.get_book_id(),
+        "reservation_date": reservation.get_reservation_date().isoformat(),
+        "expiration_date": reservation.get_expiration_date().isoformat()
+    }
+
+def to_json_value(value: Any) -> Any:
+    if isinstance(value, Customer):
+        return customer_to_row(value)
+
+    if isinstance(value, Book):
+        return book_to_row(value)
+
+    if isinstance(value, Loan):
+        return loan_to_row(value)
+
+    if isinstance(value, LoanHistoryEntry):
+        return loan_history_entry_to_row(value)
+
+    if isinstance(value, Reservation):
+        return reservation_to_row(value)
+
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+
+    if isinstance(value, (tuple, list)) or hasattr(value, "__next__"):
+        return [to_json_value(i) for i in value]
+
+    return value
@@ -0,0 +1,283 @@
+import os
+import heapq
+import datetime
+import threading
+import multiprocessing
+from typing import Any
+from multiprocessing.connection import Connection
+from api_library.library import Library
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.book.book_type import BookType
+from api_library.loan import Loan
+from api_library.history import LoanHistoryEntry
+from api_library.reservation import Reservation
+from api_library.utils import to_datetime
+from api_library.query import Predicate
+
+from api_library.exceptions import (
+    LibraryException,
+    CustomerException
+)
+
+def _run_shard(connection: Connection, file_database: str, library_options: dict[str, Any]) -> None:
+    library: Library = Library(file_database, foreign_customers=True, **library_options)
+
+    try:
+        while True:
+            try:
+                request: tuple[str, tuple] | None = connection.recv()
+            except EOFError:
+                break
+
+            if request is None:
+                break
+
+            method, args = request
+
+            try:
+                connection.send((True, getattr(library, method)(*args)))
+            except LibraryException as error:
+                connection.send((False, error))
+            except Exception as error:
+                connection.send((False, LibraryException(f"Shard failure ({error!r}).")))
+    finally:
+        library.close()
+        connection.close()
+
+class ShardedLibrary:
+    def __init__(self, file_database: str, shards_count: int = 4, **library_options) -> None:
+        self.__check_shards_count(f"{file_database}.shards", shards_count)
+
+        context = multiprocessing.get_context("spawn")
+
+        self.__shards_count: int = shards_count
+        self.__connections: list[Connection] = list()
+        self.__processes: list[multiprocessing.Process] = list()
+        self.__shard_locks: list[threading.Lock] = [threading.Lock() for _ in range(shards_count)]
+        # Operations touching a customer and books of other shards run one at a time.
+        self.__references_lock: threading.RLock = threading.RLock()
+
+        for i in range(shards_count):
+            router_connection, shard_connection = context.Pipe()
+            process = context.Process(target=_run_shard, name=f"library-shard-{i}", daemon=True,
+                                    args=(shard_connection, f"{file_database}.shard{i}", library_options))
+            process.start()
+            shard_connection.close()
+
+            self.__connections.append(router_connection)
+            self.__processes.append(process)
+
+    @staticmethod
+    def __check_shards_count(file_shards: str, shards_count: int) -> None:
+        # Ids are routed by modulo, so a library can only be reopened with the same shards count.
+        if os.path.exists(file_shards):
+            with open(file_shards, "r", encoding="utf-8") as file_handler:
+                stored_shards_count: int = int(file_handler.read())
+
+            if stored_shards_count != shards_count:
+                raise LibraryException(f"Library was created with {stored_shards_count} shard(s), not {shards_count}.")
+
+            return
+
+        with open(file_shards, "w", encoding="utf-8") as file_handler:
+            file_handler.write(str(shards_count))
+
+    def get_shards_count(self) -> int:
+        return self.__shards_count
+
+    def is_thread_safe(self) -> bool:
+        return True
+
+    def __get_shard(self, entity_id: int) -> int:
+        return entity_id % self.__shards_count
+
+    def __call(self, shard: int, method: str, *args) -> Any:
+        with self.__shard_locks[shard]:
+            self.__connections[shard].send((method, args))
+            succeeded, value = self.__connections[shard].recv()
+
+        if not succeeded:
+            raise value
+
+        return value
+
+    def __fan_out(self, method: str, *args) -> list[tuple[bool, Any]]:
+        # Every shard gets the request before any answer is read, so the shards work in parallel.
+        for lock in self.__shard_locks:
+            lock.acquire()
+
+        try:
+            for connection in self.__connections:
+                connection.send((method, args))
+
+            return [connection.recv() for connection in self.__connections]
+        finally:
+            for lock in self.__shard_locks:
+                lock.release()
+
+    def __fan_out_values(self, method: str, *args) -> list[Any]:
+        responses: list[tuple[bool, Any]] = self.__fan_out(method, *args)
+
+        for succeeded, value in responses:
+            if not succeeded:
+                raise value
+
+        return [value for _, value in responses]
+
+    def save(self) -> None:
+        self.__fan_out_values("save")
+
+    def compact(self) -> None:
+        self.__fan_out_values("compact")
+
+    def close(self) -> None:
+        with self.__references_lock:
+            for shard, connection in enumerate(self.__connections):
+                with self.__shard_locks[shard]:
+                    connection.send(None)
+
+            for process, connection in zip(self.__processes, self.__connections):
+                process.join()
+                connection.close()
+
+    def add_customer(self, customer_id: int, name: str, address: str,
+                    email: str, birth_date: datetime.date) -> None:
+
+        self.__call(self.__get_shard(customer_id), "add_customer",
+                    customer_id, name, address, email, birth_date)
+
+    def get_customer_by_id(self, customer_id: int) -> Customer:
+        return self.__call(self.__get_shard(customer_id), "get_customer_by_id", customer_id)
+
+    def get_customer_by_name(self, name: str) -> Customer:
+        for succeeded, value in self.__fan_out("get_customer_by_name", name):
+            if succeeded:
+                return value
+
+        raise CustomerException(f"Customer (Name: {name}) does not exists.")
+
+    def get_customer_loans(self, customer_id: int) -> tuple[Loan]:
+        with self.__references_lock:
+            self.get_customer_by_id(customer_id)
+
+            return tuple(loan for loans in self.__fan_out_values("get_customer_loans", customer_id)
+                        for loan in loans)
+
+    def remove_customer(self, customer_id: int) -> None:
+        # The loans live with their books, so they are returned shard by shard first.
+        with self.__references_lock:
+            for reservation in self.get_customer_reservations(customer_id):
+                self.__call(self.__get_shard(reservation.get_book_id()), "cancel_reservation",
+                            customer_id, reservation.get_book_id())
+
+            for loan in self.get_customer_loans(customer_id):
+                self.__call(self.__get_shard(loan.get_book_id()), "return_book", loan.get_book_id())
+
+            self.__call(self.__get_shard(customer_id), "remove_customer", customer_id)
+
+    def get_all_customers(self) -> tuple[Customer]:
+        return tuple(customer for customers in self.__fan_out_values("get_all_customers")
+                    for customer in customers)
+
+    def add_book(self, book_id: int, book_type: BookType,
+                name: str, author: str, date_published: datetime.date) -> None:
+
+        self.__call(self.__get_shard(book_id), "add_book", book_id, book_type, name, author, date_published)
+
+    def remove_book(self, book_id: int) -> None:
+        self.__call(self.__get_shard(book_id), "remove_book", book_id)
+
+    def get_book_by_id(self, book_id: int) -> Book:
+        return self.__call(self.__get_shard(book_id), "get_book_by_id", book_id)
+
+    def get_books_by_name(self, name: str) -> tuple[Book]:
+        return tuple(book for books in self.__fan_out_values("get_books_by_name", name) for book in books)
+
+    def get_books_by_author(self, author: str) -> tuple[Book]:
+        return tuple(book for books in self.__fan_out_values("get_books_by_author", author) for book in books)
+
+    def get_all_books(self) -> tuple[Book]:
+        return tuple(book for books in self.__fan_out_values("get_all_books") for book in books)
+
+    def is_book_loaned(self, book_id: int) -> bool:
+        return self.__call(self.__get_shard(book_id), "is_book_loaned", book_id)
+
+    def loan_book(self, customer_id: int, book_id: int, loan_date: datetime.date,
+                return_date: datetime.date) -> None:
+
+        # The loan is stored with its book, the customer is checked on its own shard.
+        with self.__references_lock:
+            self.get_customer_by_id(customer_id)
+            self.__call(self.__get_shard(book_id), "loan_book", customer_id, book_id, loan_date, return_date)
+
+    def return_book(self, book_id: int) -> None:
+        self.__call(self.__get_shard(book_id), "return_book", book_id)
+
+    def reserve_book(self, customer_id: int, book_id: int,
+                    expiration_date: datetime.date | None = None) -> None:
+
+        # The queue is kept with its book, like the loans it hands the book over to.
+        with self.__references_lock:
+            self.get_customer_by_id(customer_id)
+            self.__call(self.__get_shard(book_id), "reserve_book", customer_id, book_id, expiration_date)
+
+    def cancel_reservation(self, customer_id: int, book_id: int) -> None:
+        self.__call(self.__get_shard(book_id), "cancel_reservation", customer_id, book_id)
+
+    def get_book_reservations(self, book_id: int) -> tuple[Reservation]:
+        return self.__call(self.__get_shard(book_id), "get_book_reservations", book_id)
+
+    def get_customer_reservations(self, customer_id: int) -> tuple[Reservation]:
+        self.get_customer_by_id(customer_id)
+
+        return tuple(reservation for reservations in self.__fan_out_values("get_customer_reservations", customer_id)
+                    for reservation in reservations)
+
+    def expire_reservations(self, as_of: datetime.date | None = None) -> tuple[Reservation]:
+        if as_of is None:
+            as_of = datetime.datetime.now()
+
+        return tuple(reservation for reservations in self.__fan_out_values("expire_reservations", as_of)
+                    for reservation in reservations)
+
+    def get_loan(self, book_id: int) -> Loan:
+        return self.__call(self.__get_shard(book_id), "get_loan", book_id)
+
+    def get_all_loans(self) -> tuple[Loan]:
+        return tuple(loan for loans in self.__fan_out_values("get_all_loans") for loan in loans)
+
+    @staticmethod
+    def __merge_by_return_date(shards_loans: list[tuple[Loan]]) -> tuple[Loan]:
+        # Every shard answers in return date order, so the answers only need merging.
+        return tuple(heapq.merge(*shards_loans, key=lambda i: to_datetime(i.get_return_date())))
+
+    def get_all_late_loans(self, as_of: datetime.date | None = None) -> tuple[Loan]:
+        if as_of is None:
+            as_of = datetime.datetime.now()
+
+        return self.__merge_by_return_date(self.__fan_out_values("get_all_late_loans", as_of))
+
+    def get_loans_due_between(self, start_date: datetime.date,
+                            end_date: datetime.date) -> tuple[Loan]:
+
+        return self.__merge_by_return_date(
+            self.__fan_out_values("get_loans_due_between", start_date, end_date))
+
+    def query_books(self, predicate: Predicate) -> tuple[Book]:
+        return tuple(book for books in self.__fan_out_values("query_books", predicate) for book in books)
+
+    def query_loans(self, predicate: Predicate) -> tuple[Loan]:
+        return tuple(loan for loans in self.__fan_out_values("query_loans", predicate) for loan in loans)
+
+    def get_loan_history(self, customer_id: int | None = None, book_id: int | None = None,
+                        start_date: datetime.date | None = None,
+                        end_date: datetime.date | None = None) -> tuple[LoanHistoryEntry]:
+
+        if book_id is not None:
+            return self.__call(self.__get_shard(book_id), "get_loan_history",
+                            customer_id, book_id, start_date, end_date)
+
+        # Every shard answers in closing order, so the answers only need merging.
+        return tuple(heapq.merge(*self.__fan_out_values("get_loan_history", customer_id, book_id, start_date, end_date),
+                                key=lambda i: to_datetime(i.get_closed_date())))
@@ -0,0 +1,219 @@
+import gc
+import struct
+import datetime
+import itertools
+from typing import BinaryIO, Callable, Iterable, Iterator
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.book.book_type import BookType
+from api_library.loan import Loan
+from api_library.reservation import Reservation
+from api_library.exceptions import LibraryException
+from api_library.storage.memory_engine import MemoryEngine
+from api_library.utils import encode_date, decode_date
+
+# Subscripting these caches stays in C until a value is seen for the first time.
+class _EncodedDates(dict):
+    def __missing__(self, value: datetime.date) -> int:
+        encoded: int = encode_date(value)
+        self[value] = encoded
+
+        return encoded
+
+class _DecodedDates(dict):
+    def __missing__(self, value: int) -> datetime.date:
+        decoded: datetime.date = decode_date(value)
+        self[value] = decoded
+
+        return decoded
+
+class _StringTable(dict):
+    def __init__(self) -> None:
+        super().__init__()
+        self.__pending: list[str] = list()
+
+    def __missing__(self, value: str) -> int:
+        code: int = len(self)
+        self[value] = code
+        self.__pending.append(value)
+
+        return code
+
+    def pop_pending(self) -> list[str]:
+        pending, self.__pending = self.__pending, list()
+
+        return pending
+
+class BinaryEngine(MemoryEngine):
+    _FILE_EXTENSION: str = "libbin"
+
+    CHUNK_RECORDS: int = 65536
+
+    __MAGIC: bytes = b"LIBB"
+    __VERSION: int = 2
+    # Version 1 files have no reservations section and still load.
+    __READABLE_VERSIONS: frozenset[int] = frozenset((1, 2))
+    __HEADER: struct.Struct = struct.Struct("<4sHQ")
+    # Section, records count, new strings count and their encoded size.
+    __CHUNK: struct.Struct = struct.Struct("<BIII")
+
+    __END_SECTION: int = 0
+    __CUSTOMERS_SECTION: int = 1
+    __BOOKS_SECTION: int = 2
+    __LOANS_SECTION: int = 3
+    __RESERVATIONS_SECTION: int = 4
+
+    # Strings are written as codes into the string table, dates as encoded by encode_date.
+    __CUSTOMER: struct.Struct = struct.Struct("<qIIIq")
+    __BOOK: struct.Struct = struct.Struct("<qBIIq")
+    __LOAN: struct.Struct = struct.Struct("<qqqq")
+    __RESERVATION: struct.Struct = struct.Struct("<qqqq")
+
+    __BOOK_TYPES: dict[int, BookType] = {int(i): i for i in BookType}
+
+    def _write_snapshot(self, file_handler: BinaryIO, data: dict) -> None:
+        strings: _StringTable = _StringTable()
+        dates: _EncodedDates = _EncodedDates()
+
+        def pack_customer(customer: Customer) -> bytes:
+            return self.__CUSTOMER.pack(customer.get_id(), strings[customer.get_name()],
+                                        strings[customer.get_address()], strings[customer.get_email()],
+                                        dates[customer.get_birth_date()])
+
+        def pack_book(book: Book) -> bytes:
+            return self.__BOOK.pack(book.get_id(), book.get_type(), strings[book.get_name()],
+                                    strings[book.get_author()], dates[book.get_date_published()])
+
+        def pack_loan(loan: Loan) -> bytes:
+            return self.__LOAN.pack(loan.get_customer_id(), loan.get_book_id(),
+                                    dates[loan.get_loan_date()], dates[loan.get_return_date()])
+
+        def pack_reservation(reservation: Reservation) -> bytes:
+            return self.__RESERVATION.pack(reservation.get_customer_id(), reservation.get_book_id(),
+                                        dates[reservation.get_reservation_date()],
+                                        dates[reservation.get_expiration_date()])
+
+        file_handler.write(self.__HEADER.pack(self.__MAGIC, self.__VERSION, data["sequence"]))
+
+        self.__write_section(file_handler, self.__CUSTOMERS_SECTION, data["customers"].values(), pack_customer, strings)
+        self.__write_section(file_handler, self.__BOOKS_SECTION, data["books"].values(), pack_book, strings)
+        self.__write_section(file_handler, self.__LOANS_SECTION, data["loans"].values(), pack_loan, strings)
+        self.__write_section(file_handler, self.__RESERVATIONS_SECTION, data["reservations"], pack_reservation, strings)
+
+        file_handler.write(self.__CHUNK.pack(self.__END_SECTION, 0, 0, 0))
+
+    def __write_section(self, file_handler: BinaryIO, section: int, records: Iterable,
+                        pack_record: Callable[[object], bytes], strings: _StringTable) -> None:
+
+        temp_records: Iterator = iter(records)
+
+        # Every chunk carries the strings first used by its records, so it is readable on its own.
+        while True:
+            chunk: bytes = b"".join(map(pack_record, itertools.islice(temp_records, self.CHUNK_RECORDS)))
+
+            if not chunk:
+                return
+
+            new_strings: list[str] = strings.pop_pending()
+            encoded_strings: bytes = "".join(new_strings).encode("utf-8", "surrogatepass")
+
+            file_handler.write(self.__CHUNK.pack(section, len(chunk) // self.__get_record_struct(section).size,
+                                                len(new_strings), len(encoded_strings)))
+            file_handler.write(struct.pack(f"<{len(new_strings)}I", *map(len, new_strings)))
+            file_handler.write(encoded_strings)
+            file_handler.write(chunk)
+
+    @classmethod
+    def __get_record_struct(cls, section: int) -> struct.Struct:
+        SECTION_RECORD: dict[int, struct.Struct] = {
+            cls.__CUSTOMERS_SECTION: cls.__CUSTOMER,
+            cls.__BOOKS_SECTION: cls.__BOOK,
+            cls.__LOANS_SECTION: cls.__LOAN,
+            cls.__RESERVATIONS_SECTION: cls.__RESERVATION
+        }
+
+        if section not in SECTION_RECORD:
+            raise LibraryException(f"Corrupted library file (Section: {section}).")
+
+        return SECTION_RECORD[section]
+
+    @staticmethod
+    def __read_exactly(file_handler: BinaryIO, size: int) -> bytes:
+        data: bytes = file_handler.read(size)
+
+        if len(data) != size:
+            raise LibraryException("Corrupted library file (Unexpected end of file).")
+
+        return data
+
+    def _read_snapshot(self, file_handler: BinaryIO) -> dict:
+        # Loading only creates acyclic records, collecting while millions of them appear is wasted work.
+        gc_enabled: bool = gc.isenabled()
+        gc.disable()
+
+        try:
+            return self.__read_records(file_handler)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def __read_records(self, file_handler: BinaryIO) -> dict:
+        magic, version, sequence = self.__HEADER.unpack(self.__read_exactly(file_handler, self.__HEADER.size))
+
+        if magic != self.__MAGIC or version not in self.__READABLE_VERSIONS:
+            raise LibraryException(f"Unsupported library file format (Version: {version}).")
+
+        strings: list[str] = list()
+        dates: _DecodedDates = _DecodedDates()
+        book_types: dict[int, BookType] = self.__BOOK_TYPES
+
+        customers: dict[int, Customer] = dict()
+        books: dict[int, Book] = dict()
+        loans: dict[int, Loan] = dict()
+        reservations: list[Reservation] = list()
+
+        while True:
+            section, count, strings_count, strings_size = self.__CHUNK.unpack(
+                self.__read_exactly(file_handler, self.__CHUNK.size))
+
+            if section == self.__END_SECTION:
+                break
+
+            record_struct: struct.Struct = self.__get_record_struct(section)
+            lengths: tuple[int] = struct.unpack(f"<{strings_count}I", self.__read_exactly(file_handler, strings_count * 4))
+            text: str = self.__read_exactly(file_handler, strings_size).decode("utf-8", "surrogatepass")
+            offsets: list[int] = [0, *itertools.accumulate(lengths)]
+            strings.extend(text[offsets[i]:offsets[i + 1]] for i in range(strings_count))
+
+            rows: Iterator[tuple] = record_struct.iter_unpack(self.__read_exactly(file_handler, count * record_struct.size))
+
+            if section == self.__CUSTOMERS_SECTION:
+                customers.update(
+                    (customer_id, Customer(customer_id, strings[name], strings[address],
+                                        strings[email], dates[birth_date]))
+                    for customer_id, name, address, email, birth_date in rows
+                )
+            elif section == self.__BOOKS_SECTION:
+                books.update(
+                    (book_id, Book(book_id, book_types[book_type], strings[name],
+                                strings[author], dates[date_published]))
+                    for book_id, book_type, name, author, date_published in rows
+                )
+            elif section == self.__LOANS_SECTION:
+                loans.update(
+                    (book_id, Loan(customer_id, book_id, dates[loan_date], dates[return_date]))
+                    for customer_id, book_id, loan_date, return_date in rows
+                )
+            else:
+                reservations.extend(
+                    Reservation(customer_id, book_id, dates[reservation_date], dates[expiration_date])
+                    for customer_id, book_id, reservation_date, expiration_date in rows
+                )
+
+        return {
+            "customers": customers,
+            "books": books,
+            "loans": loans,
+            "reservations": reservations,
+            "sequence": sequence
+        }
@@ -0,0 +1,230 @@
+import mmap
+import pickle
+import struct
+import bisect
+from typing import BinaryIO, Callable, Iterator, Mapping, MutableMapping
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.loan import Loan
+from api_library.record import Record
+from api_library.exceptions import LibraryException
+from api_library.storage.memory_engine import MemoryEngine
+
+class MappedRecords(MutableMapping[int, Record]):
+    def __init__(self, buffer: memoryview, count: int, record_type: type[Record]) -> None:
+        self.__record_type: type[Record] = record_type
+        ids_size: int = count * 8
+        offsets_size: int = (count + 1) * 8
+
+        self.__order_ids: memoryview = buffer[:ids_size].cast("q")
+        self.__offsets: memoryview = buffer[ids_size:ids_size + offsets_size].cast("Q")
+        self.__sorted_ids: memoryview = buffer[ids_size + offsets_size:2 * ids_size + offsets_size].cast("q")
+        self.__sorted_positions: memoryview = buffer[2 * ids_size + offsets_size:3 * ids_size + offsets_size].cast("Q")
+        self.__blobs: memoryview = buffer[3 * ids_size + offsets_size:]
+
+        self.__decoded: dict[int, Record] = dict()
+        self.__modified: set[int] = set()
+        self.__removed: set[int] = set()
+        self.__added: dict[int, Record] = dict()
+
+    def __find_position(self, record_id: int) -> int | None:
+        i: int = bisect.bisect_left(self.__sorted_ids, record_id)
+
+        if i == len(self.__sorted_ids) or self.__sorted_ids[i] != record_id:
+            return None
+
+        return self.__sorted_positions[i]
+
+    def __is_mapped(self, record_id: int) -> bool:
+        return record_id not in self.__removed and self.__find_position(record_id) is not None
+
+    def get_raw(self, record_id: int) -> bytes | None:
+        if record_id in self.__modified or record_id in self.__removed:
+            return None
+
+        position: int | None = self.__find_position(record_id)
+
+        if position is None:
+            return None
+
+        return self.__blobs[self.__offsets[position]:self.__offsets[position + 1]].tobytes()
+
+    def copy(self) -> "MappedRecords":
+        # The copy shares the mapped file and only duplicates the changes made on top of it.
+        temp_records: MappedRecords = MappedRecords.__new__(MappedRecords)
+        temp_records.__record_type = self.__record_type
+        temp_records.__order_ids = self.__order_ids
+        temp_records.__offsets = self.__offsets
+        temp_records.__sorted_ids = self.__sorted_ids
+        temp_records.__sorted_positions = self.__sorted_positions
+        temp_records.__blobs = self.__blobs
+        temp_records.__decoded = {i: self.__decoded[i] for i in self.__modified}
+        temp_records.__modified = set(self.__modified)
+        temp_records.__removed = set(self.__removed)
+        temp_records.__added = dict(self.__added)
+
+        return temp_records
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self.__added or self.__is_mapped(record_id)
+
+    def __getitem__(self, record_id: int) -> Record:
+        if record_id in self.__added:
+            return self.__added[record_id]
+
+        if record_id in self.__decoded:
+            return self.__decoded[record_id]
+
+        if record_id in self.__removed:
+            raise KeyError(record_id)
+
+        position: int | None = self.__find_position(record_id)
+
+        if position is None:
+            raise KeyError(record_id)
+
+        record: Record = self.__record_type.__new__(self.__record_type)
+        record.__setstate__(pickle.loads(self.__blobs[self.__offsets[position]:self.__offsets[position + 1]]))
+        self.__decoded[record_id] = record
+
+        return record
+
+    def __setitem__(self, record_id: int, record: Record) -> None:
+        if record_id in self.__added or self.__find_position(record_id) is None:
+            self.__added[record_id] = record
+            return
+
+        self.__removed.discard(record_id)
+        self.__modified.add(record_id)
+        self.__decoded[record_id] = record
+
+    def __delitem__(self, record_id: int) -> None:
+        if record_id in self.__added:
+            del self.__added[record_id]
+            return
+
+        if not self.__is_mapped(record_id):
+            raise KeyError(record_id)
+
+        self.__removed.add(record_id)
+        self.__modified.discard(record_id)
+        self.__decoded.pop(record_id, None)
+
+    def __iter__(self) -> Iterator[int]:
+        for record_id in self.__order_ids:
+            if record_id in self.__removed:
+                continue
+
+            yield record_id
+
+        yield from self.__added
+
+    def __len__(self) -> int:
+        return len(self.__order_ids) - len(self.__removed) + len(self.__added)
+
+class MappedEngine(MemoryEngine):
+    _FILE_EXTENSION: str = "libmap"
+    _SNAPSHOT_INDEXES: bool = True
+
+    __MAGIC: bytes = b"LIBM"
+    __VERSION: int = 2
+    # Version 1 files have no reservations section and still load.
+    __READABLE_VERSIONS: frozenset[int] = frozenset((1, 2))
+    __HEADER: struct.Struct = struct.Struct("<4sHQ")
+    __SECTION: struct.Struct = struct.Struct("<QQQ")
+    __SECTIONS: tuple[tuple[str, type[Record]]] = (
+        ("customers", Customer),
+        ("books", Book),
+        ("loans", Loan)
+    )
+
+    def _read_snapshot(self, file_handler: BinaryIO) -> dict:
+        buffer: memoryview = memoryview(mmap.mmap(file_handler.fileno(), 0, access=mmap.ACCESS_READ))
+        magic, version, sequence = self.__HEADER.unpack_from(buffer)
+
+        if magic != self.__MAGIC or version not in self.__READABLE_VERSIONS:
+            raise LibraryException(f"Unsupported library file format (Version: {version}).")
+
+        temp_data: dict = {"sequence": sequence}
+        position: int = self.__HEADER.size
+
+        for name, record_type in self.__SECTIONS:
+            offset, size, count = self.__SECTION.unpack_from(buffer, position)
+            temp_data[name] = MappedRecords(buffer[offset:offset + size], count, record_type)
+            position += self.__SECTION.size
+
+        offset, size, _ = self.__SECTION.unpack_from(buffer, position)
+        temp_data["indexes"] = self.__get_indexes_loader(buffer[offset:offset + size]) if size else None
+
+        # Reservations are few, they are kept as a single pickle and loaded right away.
+        if version > 1:
+            offset, size, _ = self.__SECTION.unpack_from(buffer, position + self.__SECTION.size)
+            temp_data["reservations"] = pickle.loads(buffer[offset:offset + size])
+
+        return temp_data
+
+    @staticmethod
+    def __get_indexes_loader(buffer: memoryview) -> Callable[[], tuple]:
+        return lambda: pickle.loads(buffer)
+
+    def _write_snapshot(self, file_handler: BinaryIO, data: dict) -> None:
+        sections_position: int = self.__HEADER.size
+        file_handler.write(self.__HEADER.pack(self.__MAGIC, self.__VERSION, data["sequence"]))
+        file_handler.write(bytes(self.__SECTION.size * (len(self.__SECTIONS) + 2)))
+
+        sections: list[tuple[int, int, int]] = list()
+
+        for name, _ in self.__SECTIONS:
+            offset: int = file_handler.tell()
+            count: int = self.__write_records(file_handler, data[name])
+            sections.append((offset, file_handler.tell() - offset, count))
+
+        if data["indexes"] is None:
+            sections.append((0, 0, 0))
+        else:
+            offset: int = file_handler.tell()
+            pickle.dump(data["indexes"], file_handler)
+            sections.append((offset, file_handler.tell() - offset, 0))
+
+        offset = file_handler.tell()
+        pickle.dump(tuple(data["reservations"]), file_handler)
+        sections.append((offset, file_handler.tell() - offset, len(data["reservations"])))
+
+        file_handler.seek(sections_position)
+
+        for section in sections:
+            file_handler.write(self.__SECTION.pack(*section))
+
+        file_handler.seek(0, 2)
+
+    @staticmethod
+    def __write_records(file_handler: BinaryIO, records: Mapping[int, Record]) -> int:
+        order_ids: list[int] = list(records)
+        offsets: list[int] = [0]
+        blobs: list[bytes] = list()
+
+        for record_id in order_ids:
+            blob: bytes | None = None
+
+            # Records never touched since the last load are copied without being decoded.
+            if isinstance(records, MappedRecords):
+                blob = records.get_raw(record_id)
+
+            if blob is None:
+                blob = pickle.dumps(records[record_id].__getstate__(), pickle.HIGHEST_PROTOCOL)
+
+            blobs.append(blob)
+            offsets.append(offsets[-1] + len(blob))
+
+        sorted_positions: list[int] = sorted(range(len(order_ids)), key=order_ids.__getitem__)
+        count: int = len(order_ids)
+
+        file_handler.write(struct.pack(f"={count}q", *order_ids))
+        file_handler.write(struct.pack(f"={count + 1}Q", *offsets))
+        file_handler.write(struct.pack(f"={count}q", *(order_ids[i] for i in sorted_positions)))
+        file_handler.write(struct.pack(f"={count}Q", *sorted_positions))
+
+        for blob in blobs:
+            file_handler.write(blob)
+
+        return count
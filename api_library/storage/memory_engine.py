@@ -0,0 +1,558 @@
+import os
+import pickle
+import datetime
+import itertools
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping, MutableMapping
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.loan import Loan
+from api_library.reservation import Reservation
+from api_library.reservation_queues import ReservationQueues
+from api_library.journal import Journal
+from api_library.index import HashIndex, SortedIndex
+from api_library.query import Predicate, FieldPredicate
+from api_library.exceptions import LibraryException
+from api_library.storage.storage_engine import StorageEngine
+from api_library.utils import to_datetime
+
+class MemoryEngine(StorageEngine):
+    _FILE_EXTENSION: str = "pickle"
+    # Formats that store the indexes get them with every snapshot, the others rebuild them on load.
+    _SNAPSHOT_INDEXES: bool = False
+
+    def __init__(self, file_database: str, journaling: bool = False) -> None:
+        self.__file_database: str = f"{file_database}.{self._FILE_EXTENSION}"
+        self.__customers: MutableMapping[int, Customer] = dict()
+        self.__books: MutableMapping[int, Book] = dict()
+        self.__loans: MutableMapping[int, Loan] = dict()
+        self.__reservations: ReservationQueues = ReservationQueues()
+        self.__customers_by_name: HashIndex = HashIndex()
+        self.__books_by_name: HashIndex = HashIndex()
+        self.__books_by_author: HashIndex = HashIndex()
+        self.__loans_by_customer: HashIndex = HashIndex()
+        self.__loans_by_return_date: SortedIndex = SortedIndex()
+        self.__indexes_loader: Callable[[], tuple] | None = None
+        # Only queries use these, they are built on the first one and never persisted.
+        self.__books_by_type: HashIndex | None = None
+        self.__books_by_date_published: SortedIndex | None = None
+        self.__loans_by_loan_date: SortedIndex | None = None
+        self.__sequence: int = 0
+        self.__snapshot_sequence: int | None = None
+        self.__journal: Journal | None = None
+        self.__pending_records: list[tuple[str, tuple]] = list()
+
+        if not os.path.exists(self.__file_database):
+            self.__write_snapshot()
+        else:
+            self.__load()
+
+        if journaling:
+            self.__journal = Journal(f"{file_database}.journal")
+            self.__replay_journal()
+
+    def _read_snapshot(self, file_handler: BinaryIO) -> dict:
+        temp_data = pickle.load(file_handler)
+
+        # Snapshots written before storage engines existed hold the mangled Library attributes.
+        if "_Library__customers" in temp_data:
+            temp_data = {key.removeprefix("_Library__"): value for key, value in temp_data.items()}
+
+        return temp_data
+
+    def _write_snapshot(self, file_handler: BinaryIO, data: dict) -> None:
+        temp_data: dict = {
+            "customers": data["customers"],
+            "books": data["books"],
+            "loans": data["loans"],
+            "reservations": data["reservations"],
+            "sequence": data["sequence"]
+        }
+
+        pickle.dump(temp_data, file_handler)
+
+    def __load(self) -> None:
+        with open(self.__file_database, "rb") as file_handler:
+            temp_data: dict = self._read_snapshot(file_handler)
+
+        self.__customers = temp_data["customers"]
+        self.__books = temp_data["books"]
+        self.__loans = temp_data["loans"]
+        # Snapshots written before reservations existed have none.
+        self.__reservations = ReservationQueues(temp_data.get("reservations", ()))
+        self.__sequence = temp_data.get("sequence", 0)
+        self.__indexes_loader = temp_data.get("indexes")
+
+        if self.__indexes_loader is None:
+            self.__rebuild_indexes()
+
+    @staticmethod
+    def __slice(items: Iterable, offset: int, limit: int | None) -> Iterator:
+        return itertools.islice(items, offset, None if limit is None else offset + limit)
+
+    def __ensure_indexes(self) -> None:
+        if self.__indexes_loader is None:
+            return
+
+        (
+            self.__customers_by_name,
+            self.__books_by_name,
+            self.__books_by_author,
+            self.__loans_by_customer,
+            self.__loans_by_return_date
+        ) = self.__indexes_loader()
+
+        self.__indexes_loader = None
+
+    def __ensure_query_indexes(self) -> None:
+        if self.__books_by_type is not None:
+            return
+
+        books_by_type: HashIndex = HashIndex()
+        books_by_date_published: SortedIndex = SortedIndex()
+        loans_by_loan_date: SortedIndex = SortedIndex()
+
+        for book_id, book in self.__books.items():
+            books_by_type.add(book.get_type(), book_id)
+
+        books_by_date_published.add_many((to_datetime(book.get_date_published()), book_id)
+                                        for book_id, book in self.__books.items())
+        loans_by_loan_date.add_many((to_datetime(loan.get_loan_date()), book_id)
+                                    for book_id, loan in self.__loans.items())
+
+        self.__books_by_date_published = books_by_date_published
+        self.__loans_by_loan_date = loans_by_loan_date
+        self.__books_by_type = books_by_type
+
+    def __rebuild_indexes(self) -> None:
+        self.__customers_by_name.clear()
+        self.__books_by_name.clear()
+        self.__books_by_author.clear()
+        self.__loans_by_customer.clear()
+        self.__loans_by_return_date.clear()
+
+        for customer_id, customer in self.__customers.items():
+            self.__customers_by_name.add(customer.get_name(), customer_id)
+
+        for book_id, book in self.__books.items():
+            self.__books_by_name.add(book.get_name(), book_id)
+            self.__books_by_author.add(book.get_author(), book_id)
+
+        for book_id, loan in self.__loans.items():
+            self.__loans_by_customer.add(loan.get_customer_id(), book_id)
+            self.__loans_by_return_date.add(to_datetime(loan.get_return_date()), book_id)
+
+    def __replay_journal(self) -> None:
+        for sequence, records in self.__journal.replay():
+            self.apply_records(sequence, records)
+
+    def get_sequence(self) -> int:
+        return self.__sequence
+
+    def apply_records(self, sequence: int, records: list[tuple[str, tuple]]) -> bool:
+        if sequence <= self.__sequence:
+            return False
+
+        # Records only apply on top of the one before them, a gap means some were never seen.
+        if sequence > self.__sequence + 1:
+            raise LibraryException(f"Journal records {self.__sequence + 1} to {sequence - 1} are missing.")
+
+        # Applied records are already in a journal, they must not be logged again.
+        journal, self.__journal = self.__journal, None
+
+        try:
+            for operation, args in records:
+                getattr(self, operation)(*args)
+        finally:
+            self.__journal = journal
+
+        self.__sequence = sequence
+
+        return True
+
+    def __log(self, operation: str, *args) -> None:
+        self._notify(operation, *args)
+
+        if self.__journal is None:
+            return
+
+        self.__pending_records.append((operation, args))
+
+    def __get_indexes(self) -> tuple:
+        self.__ensure_indexes()
+
+        return (
+            self.__customers_by_name,
+            self.__books_by_name,
+            self.__books_by_author,
+            self.__loans_by_customer,
+            self.__loans_by_return_date
+        )
+
+    def __write_snapshot(self) -> None:
+        temp_data: dict = {
+            "customers": self.__customers,
+            "books": self.__books,
+            "loans": self.__loans,
+            "reservations": self.__reservations.get_all(),
+            "sequence": self.__sequence,
+            "indexes": self.__get_indexes()
+        }
+
+        self.__write_file(temp_data)
+
+    def __write_file(self, data: dict) -> None:
+        temp_file_database: str = f"{self.__file_database}.tmp"
+
+        try:
+            with open(temp_file_database, "wb") as file_handler:
+                self._write_snapshot(file_handler, data)
+                file_handler.flush()
+                os.fsync(file_handler.fileno())
+
+            os.replace(temp_file_database, self.__file_database)
+        except Exception as file_exception:
+            raise LibraryException(file_exception)
+
+    def commit(self) -> None:
+        if not self.__pending_records:
+            return
+
+        self.__sequence += 1
+
+        try:
+            self.__journal.append(self.__sequence, self.__pending_records)
+        except Exception as file_exception:
+            raise LibraryException(file_exception)
+        finally:
+            self.__pending_records = list()
+
+    def save(self) -> None:
+        if self.__journal is None:
+            self.__write_snapshot()
+            return
+
+        try:
+            self.__journal.sync()
+        except Exception as file_exception:
+            raise LibraryException(file_exception)
+
+    def compact(self) -> None:
+        self.__write_snapshot()
+
+        if self.__journal is not None:
+            self.__journal.truncate()
+
+    def prepare_snapshot(self) -> Callable[[], None]:
+        # Records are never changed in place, so copies of the containers are a consistent view.
+        temp_data: dict = {
+            "customers": self.__customers.copy(),
+            "books": self.__books.copy(),
+            "loans": self.__loans.copy(),
+            "reservations": self.__reservations.get_all(),
+            "sequence": self.__sequence,
+            "indexes": tuple(i.copy() for i in self.__get_indexes()) if self._SNAPSHOT_INDEXES else None
+        }
+
+        def write_snapshot() -> None:
+            self.__write_file(temp_data)
+            self.__snapshot_sequence = temp_data["sequence"]
+
+        return write_snapshot
+
+    def truncate_journal(self) -> None:
+        if self.__journal is None or self.__snapshot_sequence is None:
+            return
+
+        # Records committed while the snapshot was written are not in it and stay in the journal.
+        try:
+            self.__journal.truncate(None if self.__snapshot_sequence == self.__sequence else self.__snapshot_sequence)
+        except Exception as file_exception:
+            raise LibraryException(file_exception)
+        finally:
+            self.__snapshot_sequence = None
+
+    @classmethod
+    def convert_snapshot(cls, file_database: str, source_type: type["MemoryEngine"]) -> None:
+        # Only the snapshot is converted, the journal applies on top of it by sequence either way.
+        if not os.path.exists(f"{file_database}.{source_type._FILE_EXTENSION}"):
+            raise LibraryException(f"Library file '{file_database}.{source_type._FILE_EXTENSION}' does not exist.")
+
+        source: MemoryEngine = source_type(file_database)
+        target: MemoryEngine = cls.__new__(cls)
+        target.__file_database = f"{file_database}.{cls._FILE_EXTENSION}"
+
+        target.__write_file({
+            "customers": source.__customers,
+            "books": source.__books,
+            "loans": source.__loans,
+            "reservations": source.__reservations.get_all(),
+            "sequence": source.__sequence,
+            "indexes": source.__get_indexes() if cls._SNAPSHOT_INDEXES else None
+        })
+
+        source.close()
+
+    def close(self) -> None:
+        if self.__journal is not None:
+            self.__journal.close()
+
+    def has_customer(self, customer_id: int) -> bool:
+        return customer_id in self.__customers
+
+    def get_customer(self, customer_id: int) -> Customer:
+        return self.__customers[customer_id]
+
+    def get_customer_by_name(self, name: str) -> Customer | None:
+        self.__ensure_indexes()
+
+        customer_id: int | None = self.__customers_by_name.get_first(name)
+
+        if customer_id is None:
+            return None
+
+        return self.__customers[customer_id]
+
+    def get_all_customers(self) -> tuple[Customer]:
+        return tuple(self.__customers.values())
+
+    def iter_customers(self, offset: int = 0, limit: int | None = None) -> Iterator[Customer]:
+        return self.__slice(self.__customers.values(), offset, limit)
+
+    def insert_customer(self, customer: Customer) -> None:
+        self.__ensure_indexes()
+
+        self.__customers[customer.get_id()] = customer
+        self.__customers_by_name.add(customer.get_name(), customer.get_id())
+        self.__log("insert_customer", customer)
+
+    def delete_customer(self, customer_id: int) -> None:
+        self.__ensure_indexes()
+
+        customer: Customer = self.__customers.pop(customer_id)
+        self.__customers_by_name.remove(customer.get_name(), customer_id)
+        self.__log("delete_customer", customer_id)
+
+    def has_book(self, book_id: int) -> bool:
+        return book_id in self.__books
+
+    def get_book(self, book_id: int) -> Book:
+        return self.__books[book_id]
+
+    def get_books_by_name(self, name: str) -> tuple[Book]:
+        self.__ensure_indexes()
+
+        return tuple(self.__books[i] for i in self.__books_by_name.get(name))
+
+    def get_books_by_author(self, author: str) -> tuple[Book]:
+        self.__ensure_indexes()
+
+        return tuple(self.__books[i] for i in self.__books_by_author.get(author))
+
+    def get_all_books(self) -> tuple[Book]:
+        return tuple(self.__books.values())
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        return self.__slice(self.__books.values(), offset, limit)
+
+    def iter_books_by_name(self, name: str, offset: int = 0,
+                        limit: int | None = None) -> Iterator[Book]:
+
+        self.__ensure_indexes()
+
+        return self.__slice((self.__books[i] for i in self.__books_by_name.iter(name)), offset, limit)
+
+    def iter_books_by_author(self, author: str, offset: int = 0,
+                            limit: int | None = None) -> Iterator[Book]:
+
+        self.__ensure_indexes()
+
+        return self.__slice((self.__books[i] for i in self.__books_by_author.iter(author)), offset, limit)
+
+    def insert_book(self, book: Book) -> None:
+        self.__ensure_indexes()
+
+        self.__books[book.get_id()] = book
+        self.__books_by_name.add(book.get_name(), book.get_id())
+        self.__books_by_author.add(book.get_author(), book.get_id())
+
+        if self.__books_by_type is not None:
+            self.__books_by_type.add(book.get_type(), book.get_id())
+            self.__books_by_date_published.add(to_datetime(book.get_date_published()), book.get_id())
+
+        self.__log("insert_book", book)
+
+    def delete_book(self, book_id: int) -> None:
+        self.__ensure_indexes()
+
+        book: Book = self.__books.pop(book_id)
+        self.__books_by_name.remove(book.get_name(), book_id)
+        self.__books_by_author.remove(book.get_author(), book_id)
+
+        if self.__books_by_type is not None:
+            self.__books_by_type.remove(book.get_type(), book_id)
+            self.__books_by_date_published.remove(to_datetime(book.get_date_published()), book_id)
+
+        self.__log("delete_book", book_id)
+
+    def has_loan(self, book_id: int) -> bool:
+        return book_id in self.__loans
+
+    def get_loan(self, book_id: int) -> Loan:
+        return self.__loans[book_id]
+
+    def get_customer_loans(self, customer_id: int) -> tuple[Loan]:
+        self.__ensure_indexes()
+
+        return tuple(self.__loans[i] for i in self.__loans_by_customer.get(customer_id))
+
+    def get_loans_by_return_date(self, lower: datetime.datetime | None = None,
+                                upper: datetime.datetime | None = None,
+                                include_upper: bool = False) -> tuple[Loan]:
+
+        self.__ensure_indexes()
+
+        book_ids: tuple[int] = self.__loans_by_return_date.get_range(lower, upper, include_upper)
+
+        return tuple(self.__loans[i] for i in book_ids)
+
+    def get_all_loans(self) -> tuple[Loan]:
+        return tuple(self.__loans.values())
+
+    def iter_loans(self, offset: int = 0, limit: int | None = None) -> Iterator[Loan]:
+        return self.__slice(self.__loans.values(), offset, limit)
+
+    def insert_loan(self, loan: Loan) -> None:
+        self.__ensure_indexes()
+
+        self.__loans[loan.get_book_id()] = loan
+        self.__loans_by_customer.add(loan.get_customer_id(), loan.get_book_id())
+        self.__loans_by_return_date.add(to_datetime(loan.get_return_date()), loan.get_book_id())
+
+        if self.__loans_by_loan_date is not None:
+            self.__loans_by_loan_date.add(to_datetime(loan.get_loan_date()), loan.get_book_id())
+
+        self.__log("insert_loan", loan)
+
+    def insert_loans(self, loans: Iterable[Loan]) -> None:
+        self.__ensure_indexes()
+
+        temp_return_dates: list[tuple[datetime.datetime, int]] = list()
+        temp_loan_dates: list[tuple[datetime.datetime, int]] = list()
+
+        for loan in loans:
+            self.__loans[loan.get_book_id()] = loan
+            self.__loans_by_customer.add(loan.get_customer_id(), loan.get_book_id())
+            temp_return_dates.append((to_datetime(loan.get_return_date()), loan.get_book_id()))
+            temp_loan_dates.append((to_datetime(loan.get_loan_date()), loan.get_book_id()))
+            self.__log("insert_loan", loan)
+
+        self.__loans_by_return_date.add_many(temp_return_dates)
+
+        if self.__loans_by_loan_date is not None:
+            self.__loans_by_loan_date.add_many(temp_loan_dates)
+
+    def delete_loan(self, book_id: int) -> None:
+        self.__ensure_indexes()
+
+        loan: Loan = self.__loans.pop(book_id)
+        self.__loans_by_customer.remove(loan.get_customer_id(), book_id)
+        self.__loans_by_return_date.remove(to_datetime(loan.get_return_date()), book_id)
+
+        if self.__loans_by_loan_date is not None:
+            self.__loans_by_loan_date.remove(to_datetime(loan.get_loan_date()), book_id)
+
+        self.__log("delete_loan", book_id)
+
+    def has_reservation(self, customer_id: int, book_id: int) -> bool:
+        return self.__reservations.has(customer_id, book_id)
+
+    def get_book_reservations(self, book_id: int) -> tuple[Reservation]:
+        return self.__reservations.get_book_reservations(book_id)
+
+    def get_first_reservation(self, book_id: int) -> Reservation | None:
+        return self.__reservations.get_first(book_id)
+
+    def get_customer_reservations(self, customer_id: int) -> tuple[Reservation]:
+        return self.__reservations.get_customer_reservations(customer_id)
+
+    def get_expired_reservations(self, as_of: datetime.datetime) -> tuple[Reservation]:
+        return self.__reservations.get_expired(as_of)
+
+    def insert_reservation(self, reservation: Reservation) -> None:
+        self.__reservations.add(reservation)
+        self.__log("insert_reservation", reservation)
+
+    def delete_reservation(self, customer_id: int, book_id: int) -> None:
+        self.__reservations.remove(customer_id, book_id)
+        self.__log("delete_reservation", customer_id, book_id)
+
+    @staticmethod
+    def __get_selection(conjunct: FieldPredicate, index: HashIndex | SortedIndex | Mapping
+                        ) -> tuple[int, Callable[[], Iterable[int]]] | None:
+
+        # Every candidate index reports its exact match count in O(log n), the smallest one wins.
+        values: tuple | None = conjunct.get_values()
+
+        if isinstance(index, HashIndex):
+            if values is None:
+                return None
+
+            return (sum(index.count(i) for i in values),
+                    lambda: [j for i in values for j in index.iter(i)])
+
+        if isinstance(index, SortedIndex):
+            ranges: tuple[tuple[Any, Any, bool]] = conjunct.get_ranges()
+
+            return (sum(index.count_range(*i) for i in ranges),
+                    lambda: [j for i in ranges for j in index.get_range(*i)])
+
+        if values is None:
+            return None
+
+        temp_ids: list[int] = [i for i in values if i in index]
+
+        return len(temp_ids), lambda: temp_ids
+
+    def __query(self, predicate: Predicate, records: Mapping[int, Any],
+                indexes: dict[str, HashIndex | SortedIndex | Mapping]) -> tuple:
+
+        best_selection: tuple[int, Callable[[], Iterable[int]]] | None = None
+
+        for conjunct in predicate.get_conjuncts():
+            if not isinstance(conjunct, FieldPredicate) or conjunct.get_field() not in indexes:
+                continue
+
+            selection = self.__get_selection(conjunct, indexes[conjunct.get_field()])
+
+            if selection is not None and (best_selection is None or selection[0] < best_selection[0]):
+                best_selection = selection
+
+        if best_selection is None:
+            candidates: Iterable = records.values()
+        else:
+            candidates = (records[i] for i in best_selection[1]())
+
+        return tuple(i for i in candidates if predicate.matches(i))
+
+    def query_books(self, predicate: Predicate) -> tuple[Book]:
+        self.__ensure_indexes()
+        self.__ensure_query_indexes()
+
+        return self.__query(predicate, self.__books, {
+            "id": self.__books,
+            "type": self.__books_by_type,
+            "name": self.__books_by_name,
+            "author": self.__books_by_author,
+            "date_published": self.__books_by_date_published
+        })
+
+    def query_loans(self, predicate: Predicate) -> tuple[Loan]:
+        self.__ensure_indexes()
+        self.__ensure_query_indexes()
+
+        return self.__query(predicate, self.__loans, {
+            "book_id": self.__loans,
+            "customer_id": self.__loans_by_customer,
+            "return_date": self.__loans_by_return_date,
+            "loan_date": self.__loans_by_loan_date
+        })
@@ -0,0 +1,409 @@
+import sqlite3
+import datetime
+from typing import Any, Iterable, Iterator
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.book.book_type import BookType
+from api_library.loan import Loan
+from api_library.reservation import Reservation
+from api_library.exceptions import LibraryException
+from api_library.storage.storage_engine import StorageEngine
+from api_library.utils import to_datetime
+from api_library.query import DATE_FIELDS, Predicate, FieldPredicate
+
+class SQLiteEngine(StorageEngine):
+    __SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            address TEXT NOT NULL,
+            email TEXT NOT NULL,
+            birth_date TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS customers_name ON customers (name);
+
+        CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY,
+            type INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            author TEXT NOT NULL,
+            date_published TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS books_name ON books (name);
+        CREATE INDEX IF NOT EXISTS books_author ON books (author);
+        CREATE INDEX IF NOT EXISTS books_type ON books (type);
+        CREATE INDEX IF NOT EXISTS books_date_published ON books (date_published);
+
+        CREATE TABLE IF NOT EXISTS loans (
+            book_id INTEGER PRIMARY KEY,
+            customer_id INTEGER NOT NULL,
+            loan_date TEXT NOT NULL,
+            return_date TEXT NOT NULL,
+            return_key TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS loans_customer ON loans (customer_id);
+        CREATE INDEX IF NOT EXISTS loans_return_key ON loans (return_key);
+        CREATE INDEX IF NOT EXISTS loans_loan_date ON loans (loan_date);
+
+        CREATE TABLE IF NOT EXISTS reservations (
+            book_id INTEGER NOT NULL,
+            customer_id INTEGER NOT NULL,
+            reservation_date TEXT NOT NULL,
+            expiration_date TEXT NOT NULL,
+            expiration_key TEXT NOT NULL,
+            PRIMARY KEY (book_id, customer_id)
+        );
+        CREATE INDEX IF NOT EXISTS reservations_customer ON reservations (customer_id);
+        CREATE INDEX IF NOT EXISTS reservations_expiration_key ON reservations (expiration_key);
+    """
+
+    def __init__(self, file_database: str, journaling: bool = False) -> None:
+        self.__file_database: str = f"{file_database}.sqlite3"
+
+        try:
+            self.__connection: sqlite3.Connection = sqlite3.connect(self.__file_database, check_same_thread=False)
+
+            if journaling:
+                self.__connection.execute("PRAGMA journal_mode=WAL")
+
+            self.__connection.executescript(self.__SCHEMA)
+        except sqlite3.Error as database_exception:
+            raise LibraryException(database_exception)
+
+    @staticmethod
+    def __encode_date(value: datetime.date) -> str:
+        return value.isoformat()
+
+    @staticmethod
+    def __decode_date(value: str) -> datetime.date:
+        if "T" in value:
+            return datetime.datetime.fromisoformat(value)
+
+        return datetime.date.fromisoformat(value)
+
+    @staticmethod
+    def __encode_key(value: datetime.date) -> str:
+        return to_datetime(value).isoformat(timespec="microseconds")
+
+    def __to_customer(self, row: tuple) -> Customer:
+        return Customer(row[0], row[1], row[2], row[3], self.__decode_date(row[4]))
+
+    def __to_book(self, row: tuple) -> Book:
+        return Book(row[0], BookType(row[1]), row[2], row[3], self.__decode_date(row[4]))
+
+    def __to_loan(self, row: tuple) -> Loan:
+        return Loan(row[1], row[0], self.__decode_date(row[2]), self.__decode_date(row[3]))
+
+    def __to_reservation(self, row: tuple) -> Reservation:
+        return Reservation(row[1], row[0], self.__decode_date(row[2]), self.__decode_date(row[3]))
+
+    def __from_customer(self, customer: Customer) -> tuple:
+        return (customer.get_id(), customer.get_name(), customer.get_address(),
+                customer.get_email(), self.__encode_date(customer.get_birth_date()))
+
+    def __from_book(self, book: Book) -> tuple:
+        return (book.get_id(), int(book.get_type()), book.get_name(),
+                book.get_author(), self.__encode_date(book.get_date_published()))
+
+    def __from_loan(self, loan: Loan) -> tuple:
+        return (loan.get_book_id(), loan.get_customer_id(),
+                self.__encode_date(loan.get_loan_date()),
+                self.__encode_date(loan.get_return_date()),
+                self.__encode_key(loan.get_return_date()))
+
+    def __from_reservation(self, reservation: Reservation) -> tuple:
+        return (reservation.get_book_id(), reservation.get_customer_id(),
+                self.__encode_date(reservation.get_reservation_date()),
+                self.__encode_date(reservation.get_expiration_date()),
+                self.__encode_key(reservation.get_expiration_date()))
+
+    def __execute(self, query: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        try:
+            return self.__connection.execute(query, parameters)
+        except sqlite3.Error as database_exception:
+            raise LibraryException(database_exception)
+
+    def __execute_many(self, query: str, parameters: Iterable[tuple]) -> None:
+        try:
+            self.__connection.executemany(query, parameters)
+        except sqlite3.Error as database_exception:
+            raise LibraryException(database_exception)
+
+    @staticmethod
+    def __get_date_condition(column: str, ranges: tuple[tuple[Any, Any, bool]],
+                            parameters: list[Any]) -> str:
+
+        # Stored dates and datetimes are ISO text, comparing whole days keeps the index usable.
+        # The bounds are widened to full days, the exact match is done on the decoded rows.
+        temp_conditions: list[str] = list()
+
+        for lower, upper, _ in ranges:
+            temp_bounds: list[str] = ["1"]
+
+            if lower is not None:
+                temp_bounds.append(f"{column} >= ?")
+                parameters.append(lower.date().isoformat())
+
+            if upper is not None:
+                temp_bounds.append(f"{column} < ?")
+                parameters.append((upper.date() + datetime.timedelta(days=1)).isoformat())
+
+            temp_conditions.append(" AND ".join(temp_bounds))
+
+        return "(" + " OR ".join(f"({i})" for i in temp_conditions) + ")"
+
+    def __query(self, table: str, columns: frozenset[str], predicate: Predicate) -> sqlite3.Cursor:
+        conditions: list[str] = ["1"]
+        parameters: list[Any] = list()
+
+        for conjunct in predicate.get_conjuncts():
+            if not isinstance(conjunct, FieldPredicate) or conjunct.get_field() not in columns:
+                continue
+
+            column: str = conjunct.get_field()
+            values: tuple | None = conjunct.get_values()
+
+            if column in DATE_FIELDS:
+                conditions.append(self.__get_date_condition(column, conjunct.get_ranges(), parameters))
+            elif values is not None:
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                parameters.extend(values)
+            else:
+                lower, upper, include_upper = conjunct.get_ranges()[0]
+
+                if lower is not None:
+                    conditions.append(f"{column} >= ?")
+                    parameters.append(lower)
+
+                if upper is not None:
+                    conditions.append(f"{column} <= ?" if include_upper else f"{column} < ?")
+                    parameters.append(upper)
+
+        return self.__execute(f"SELECT * FROM {table} WHERE {' AND '.join(conditions)}", tuple(parameters))
+
+    def __iter_page(self, query: str, parameters: tuple, offset: int,
+                    limit: int | None) -> sqlite3.Cursor:
+
+        # A negative LIMIT means no limit in SQLite.
+        return self.__execute(f"{query} ORDER BY rowid LIMIT ? OFFSET ?",
+                            parameters + (-1 if limit is None else limit, offset))
+
+    def commit(self) -> None:
+        try:
+            self.__connection.commit()
+        except sqlite3.Error as database_exception:
+            raise LibraryException(database_exception)
+
+    def save(self) -> None:
+        self.commit()
+
+    def compact(self) -> None:
+        self.commit()
+        self.__execute("VACUUM")
+
+    def close(self) -> None:
+        self.commit()
+        self.__connection.close()
+
+    def has_customer(self, customer_id: int) -> bool:
+        return self.__execute("SELECT 1 FROM customers WHERE id = ?", (customer_id,)).fetchone() is not None
+
+    def get_customer(self, customer_id: int) -> Customer:
+        row = self.__execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
+
+        if row is None:
+            raise KeyError(customer_id)
+
+        return self.__to_customer(row)
+
+    def get_customer_by_name(self, name: str) -> Customer | None:
+        row = self.__execute("SELECT * FROM customers WHERE name = ? ORDER BY rowid LIMIT 1", (name,)).fetchone()
+
+        if row is None:
+            return None
+
+        return self.__to_customer(row)
+
+    def get_all_customers(self) -> tuple[Customer]:
+        return tuple(self.__to_customer(i) for i in self.__execute("SELECT * FROM customers"))
+
+    def iter_customers(self, offset: int = 0, limit: int | None = None) -> Iterator[Customer]:
+        return map(self.__to_customer, self.__iter_page("SELECT * FROM customers", (), offset, limit))
+
+    def insert_customer(self, customer: Customer) -> None:
+        self.__execute("INSERT INTO customers VALUES (?, ?, ?, ?, ?)", self.__from_customer(customer))
+        self._notify("insert_customer", customer)
+
+    def insert_customers(self, customers: Iterable[Customer]) -> None:
+        temp_customers: tuple[Customer] = tuple(customers)
+
+        self.__execute_many("INSERT INTO customers VALUES (?, ?, ?, ?, ?)",
+                            (self.__from_customer(i) for i in temp_customers))
+
+        for customer in temp_customers:
+            self._notify("insert_customer", customer)
+
+    def delete_customer(self, customer_id: int) -> None:
+        self.__execute("DELETE FROM customers WHERE id = ?", (customer_id,))
+        self._notify("delete_customer", customer_id)
+
+    def has_book(self, book_id: int) -> bool:
+        return self.__execute("SELECT 1 FROM books WHERE id = ?", (book_id,)).fetchone() is not None
+
+    def get_book(self, book_id: int) -> Book:
+        row = self.__execute("SELECT * FROM books WHERE id = ?", (book_id,)).fetchone()
+
+        if row is None:
+            raise KeyError(book_id)
+
+        return self.__to_book(row)
+
+    def get_books_by_name(self, name: str) -> tuple[Book]:
+        return tuple(self.__to_book(i) for i in self.__execute("SELECT * FROM books WHERE name = ?", (name,)))
+
+    def get_books_by_author(self, author: str) -> tuple[Book]:
+        return tuple(self.__to_book(i) for i in self.__execute("SELECT * FROM books WHERE author = ?", (author,)))
+
+    def get_all_books(self) -> tuple[Book]:
+        return tuple(self.__to_book(i) for i in self.__execute("SELECT * FROM books"))
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        return map(self.__to_book, self.__iter_page("SELECT * FROM books", (), offset, limit))
+
+    def iter_books_by_name(self, name: str, offset: int = 0,
+                        limit: int | None = None) -> Iterator[Book]:
+
+        return map(self.__to_book, self.__iter_page(
+            "SELECT * FROM books WHERE name = ?", (name,), offset, limit))
+
+    def iter_books_by_author(self, author: str, offset: int = 0,
+                            limit: int | None = None) -> Iterator[Book]:
+
+        return map(self.__to_book, self.__iter_page(
+            "SELECT * FROM books WHERE author = ?", (author,), offset, limit))
+
+    def insert_book(self, book: Book) -> None:
+        self.__execute("INSERT INTO books VALUES (?, ?, ?, ?, ?)", self.__from_book(book))
+        self._notify("insert_book", book)
+
+    def insert_books(self, books: Iterable[Book]) -> None:
+        temp_books: tuple[Book] = tuple(books)
+
+        self.__execute_many("INSERT INTO books VALUES (?, ?, ?, ?, ?)",
+                            (self.__from_book(i) for i in temp_books))
+
+        for book in temp_books:
+            self._notify("insert_book", book)
+
+    def delete_book(self, book_id: int) -> None:
+        self.__execute("DELETE FROM books WHERE id = ?", (book_id,))
+        self._notify("delete_book", book_id)
+
+    def has_loan(self, book_id: int) -> bool:
+        return self.__execute("SELECT 1 FROM loans WHERE book_id = ?", (book_id,)).fetchone() is not None
+
+    def get_loan(self, book_id: int) -> Loan:
+        row = self.__execute("SELECT * FROM loans WHERE book_id = ?", (book_id,)).fetchone()
+
+        if row is None:
+            raise KeyError(book_id)
+
+        return self.__to_loan(row)
+
+    def get_customer_loans(self, customer_id: int) -> tuple[Loan]:
+        return tuple(self.__to_loan(i) for i in self.__execute(
+            "SELECT * FROM loans WHERE customer_id = ?", (customer_id,)))
+
+    def get_loans_by_return_date(self, lower: datetime.datetime | None = None,
+                                upper: datetime.datetime | None = None,
+                                include_upper: bool = False) -> tuple[Loan]:
+
+        conditions: list[str] = list()
+        parameters: list[str] = list()
+
+        if lower is not None:
+            conditions.append("return_key >= ?")
+            parameters.append(self.__encode_key(lower))
+
+        if upper is not None:
+            conditions.append("return_key <= ?" if include_upper else "return_key < ?")
+            parameters.append(self.__encode_key(upper))
+
+        query: str = "SELECT * FROM loans"
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY return_key"
+
+        return tuple(self.__to_loan(i) for i in self.__execute(query, tuple(parameters)))
+
+    def get_all_loans(self) -> tuple[Loan]:
+        return tuple(self.__to_loan(i) for i in self.__execute("SELECT * FROM loans"))
+
+    def iter_loans(self, offset: int = 0, limit: int | None = None) -> Iterator[Loan]:
+        return map(self.__to_loan, self.__iter_page("SELECT * FROM loans", (), offset, limit))
+
+    def insert_loan(self, loan: Loan) -> None:
+        self.__execute("INSERT INTO loans VALUES (?, ?, ?, ?, ?)", self.__from_loan(loan))
+        self._notify("insert_loan", loan)
+
+    def insert_loans(self, loans: Iterable[Loan]) -> None:
+        temp_loans: tuple[Loan] = tuple(loans)
+
+        self.__execute_many("INSERT INTO loans VALUES (?, ?, ?, ?, ?)",
+                            (self.__from_loan(i) for i in temp_loans))
+
+        for loan in temp_loans:
+            self._notify("insert_loan", loan)
+
+    def delete_loan(self, book_id: int) -> None:
+        self.__execute("DELETE FROM loans WHERE book_id = ?", (book_id,))
+        self._notify("delete_loan", book_id)
+
+    def has_reservation(self, customer_id: int, book_id: int) -> bool:
+        return self.__execute("SELECT 1 FROM reservations WHERE book_id = ? AND customer_id = ?",
+                            (book_id, customer_id)).fetchone() is not None
+
+    def get_book_reservations(self, book_id: int) -> tuple[Reservation]:
+        # Rows are appended with increasing rowids, so rowid order is queue order.
+        return tuple(self.__to_reservation(i) for i in self.__execute(
+            "SELECT * FROM reservations WHERE book_id = ? ORDER BY rowid", (book_id,)))
+
+    def get_first_reservation(self, book_id: int) -> Reservation | None:
+        row = self.__execute("SELECT * FROM reservations WHERE book_id = ? ORDER BY rowid LIMIT 1",
+                            (book_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        return self.__to_reservation(row)
+
+    def get_customer_reservations(self, customer_id: int) -> tuple[Reservation]:
+        return tuple(self.__to_reservation(i) for i in self.__execute(
+            "SELECT * FROM reservations WHERE customer_id = ? ORDER BY rowid", (customer_id,)))
+
+    def get_expired_reservations(self, as_of: datetime.datetime) -> tuple[Reservation]:
+        return tuple(self.__to_reservation(i) for i in self.__execute(
+            "SELECT * FROM reservations WHERE expiration_key <= ? ORDER BY expiration_key",
+            (self.__encode_key(as_of),)))
+
+    def insert_reservation(self, reservation: Reservation) -> None:
+        self.__execute("INSERT INTO reservations VALUES (?, ?, ?, ?, ?)", self.__from_reservation(reservation))
+        self._notify("insert_reservation", reservation)
+
+    def delete_reservation(self, customer_id: int, book_id: int) -> None:
+        self.__execute("DELETE FROM reservations WHERE book_id = ? AND customer_id = ?", (book_id, customer_id))
+        self._notify("delete_reservation", customer_id, book_id)
+
+    def query_books(self, predicate: Predicate) -> tuple[Book]:
+        temp_books: Iterator[Book] = map(self.__to_book, self.__query(
+            "books", frozenset(("id", "type", "name", "author", "date_published")), predicate))
+
+        return tuple(i for i in temp_books if predicate.matches(i))
+
+    def query_loans(self, predicate: Predicate) -> tuple[Loan]:
+        temp_loans: Iterator[Loan] = map(self.__to_loan, self.__query(
+            "loans", frozenset(("book_id", "customer_id", "loan_date", "return_date")), predicate))
+
+        return tuple(i for i in temp_loans if predicate.matches(i))
@@ -0,0 +1,205 @@
+import datetime
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Iterator
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.loan import Loan
+from api_library.reservation import Reservation
+from api_library.exceptions import LibraryException
+from api_library.query import Predicate
+
+class StorageEngine(ABC):
+    _listeners: tuple[Callable[[str, tuple], None]] = ()
+
+    @abstractmethod
+    def commit(self) -> None:
+        pass
+
+    @abstractmethod
+    def save(self) -> None:
+        pass
+
+    @abstractmethod
+    def compact(self) -> None:
+        pass
+
+    def query_books(self, predicate: Predicate) -> tuple[Book]:
+        return tuple(i for i in self.iter_books() if predicate.matches(i))
+
+    def query_loans(self, predicate: Predicate) -> tuple[Loan]:
+        return tuple(i for i in self.iter_loans() if predicate.matches(i))
+
+    def get_sequence(self) -> int:
+        raise LibraryException(f"{type(self).__name__} does not keep a mutation sequence.")
+
+    def apply_records(self, sequence: int, records: list[tuple[str, tuple]]) -> bool:
+        raise LibraryException(f"{type(self).__name__} can not apply journal records.")
+
+    def add_listener(self, listener: Callable[[str, tuple], None]) -> None:
+        # Replaced rather than mutated, so a notification in progress keeps its own tuple.
+        self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener: Callable[[str, tuple], None]) -> None:
+        self._listeners = tuple(i for i in self._listeners if i != listener)
+
+    def _notify(self, operation: str, *args) -> None:
+        for listener in self._listeners:
+            listener(operation, args)
+
+    def prepare_snapshot(self) -> Callable[[], None]:
+        # Engines without a cheap consistent view persist right away.
+        self.save()
+
+        return lambda: None
+
+    def truncate_journal(self) -> None:
+        # Called under the write lock once a prepared snapshot is on disk.
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def has_customer(self, customer_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def get_customer(self, customer_id: int) -> Customer:
+        pass
+
+    @abstractmethod
+    def get_customer_by_name(self, name: str) -> Customer | None:
+        pass
+
+    @abstractmethod
+    def get_all_customers(self) -> tuple[Customer]:
+        pass
+
+    @abstractmethod
+    def iter_customers(self, offset: int = 0, limit: int | None = None) -> Iterator[Customer]:
+        pass
+
+    @abstractmethod
+    def insert_customer(self, customer: Customer) -> None:
+        pass
+
+    def insert_customers(self, customers: Iterable[Customer]) -> None:
+        for customer in customers:
+            self.insert_customer(customer)
+
+    @abstractmethod
+    def delete_customer(self, customer_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def has_book(self, book_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def get_book(self, book_id: int) -> Book:
+        pass
+
+    @abstractmethod
+    def get_books_by_name(self, name: str) -> tuple[Book]:
+        pass
+
+    @abstractmethod
+    def get_books_by_author(self, author: str) -> tuple[Book]:
+        pass
+
+    @abstractmethod
+    def get_all_books(self) -> tuple[Book]:
+        pass
+
+    @abstractmethod
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        pass
+
+    @abstractmethod
+    def iter_books_by_name(self, name: str, offset: int = 0,
+                        limit: int | None = None) -> Iterator[Book]:
+        pass
+
+    @abstractmethod
+    def iter_books_by_author(self, author: str, offset: int = 0,
+                            limit: int | None = None) -> Iterator[Book]:
+        pass
+
+    @abstractmethod
+    def insert_book(self, book: Book) -> None:
+        pass
+
+    def insert_books(self, books: Iterable[Book]) -> None:
+        for book in books:
+            self.insert_book(book)
+
+    @abstractmethod
+    def delete_book(self, book_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def has_loan(self, book_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def get_loan(self, book_id: int) -> Loan:
+        pass
+
+    @abstractmethod
+    def get_customer_loans(self, customer_id: int) -> tuple[Loan]:
+        pass
+
+    @abstractmethod
+    def get_loans_by_return_date(self, lower: datetime.datetime | None = None,
+                                upper: datetime.datetime | None = None,
+                                include_upper: bool = False) -> tuple[Loan]:
+        pass
+
+    @abstractmethod
+    def get_all_loans(self) -> tuple[Loan]:
+        pass
+
+    @abstractmethod
+    def iter_loans(self, offset: int = 0, limit: int | None = None) -> Iterator[Loan]:
+        pass
+
+    @abstractmethod
+    def insert_loan(self, loan: Loan) -> None:
+        pass
+
+    def insert_loans(self, loans: Iterable[Loan]) -> None:
+        for loan in loans:
+            self.insert_loan(loan)
+
+    @abstractmethod
+    def delete_loan(self, book_id: int) -> None:
+        pass
+
+    @abstractmethod
+    def has_reservation(self, customer_id: int, book_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def get_book_reservations(self, book_id: int) -> tuple[Reservation]:
+        pass
+
+    @abstractmethod
+    def get_first_reservation(self, book_id: int) -> Reservation | None:
+        pass
+
+    @abstractmethod
+    def get_customer_reservations(self, customer_id: int) -> tuple[Reservation]:
+        pass
+
+    @abstractmethod
+    def get_expired_reservations(self, as_of: datetime.datetime) -> tuple[Reservation]:
+        pass
+
+    @abstractmethod
+    def insert_reservation(self, reservation: Reservation) -> None:
+        pass
+
+    @abstractmethod
+    def delete_reservation(self, customer_id: int, book_id: int) -> None:
+        pass
@@ -0,0 +1,25 @@
+from enum import IntEnum
+from api_library.storage.storage_engine import StorageEngine
+from api_library.storage.memory_engine import MemoryEngine
+from api_library.storage.sqlite_engine import SQLiteEngine
+from api_library.storage.mapped_engine import MappedEngine
+from api_library.storage.binary_engine import BinaryEngine
+
+class StorageType(IntEnum):
+    PICKLE = 1
+    SQLITE = 2
+    MAPPED = 3
+    BINARY = 4
+
+    def get_engine_type(self) -> type[StorageEngine]:
+        STORAGE_TYPE_ENGINE: dict[StorageType, type[StorageEngine]] = {
+            self.PICKLE: MemoryEngine,
+            self.SQLITE: SQLiteEngine,
+            self.MAPPED: MappedEngine,
+            self.BINARY: BinaryEngine
+        }
+
+        return STORAGE_TYPE_ENGINE[self]
+
+    def create_engine(self, file_database: str, journaling: bool = False) -> StorageEngine:
+        return self.get_engine_type()(file_database, journaling)
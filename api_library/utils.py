@@ -0,0 +1,26 @@
+import datetime
+
+_DAY_US: int = 86_400_000_000
+
+def to_datetime(value: datetime.date) -> datetime.datetime:
+    if isinstance(value, datetime.datetime):
+        return value
+
+    return datetime.datetime.combine(value, datetime.time.min)
+
+def encode_date(value: datetime.date) -> int:
+    # Microseconds since the first proleptic Gregorian day, the lowest bit tells a datetime apart.
+    if isinstance(value, datetime.datetime):
+        temp_time_us: int = ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+
+        return (value.toordinal() * _DAY_US + temp_time_us) << 1 | 1
+
+    return value.toordinal() * _DAY_US << 1
+
+def decode_date(value: int) -> datetime.date:
+    days, time_us = divmod(value >> 1, _DAY_US)
+
+    if not value & 1:
+        return datetime.date.fromordinal(days)
+
+    return datetime.datetime.fromordinal(days) + datetime.timedelta(microseconds=time_us)
@@ -1,8 +1,11 @@
 from enum import IntEnum, auto
 import time
+import json
+import itertools
 import datetime
 from api_library.library import Library
 from api_library.book.book_type import BookType
+from app_library.report_renderer import ReportRenderer
 
 from app_library.utils import (
     get_input_from_user_str,
@@ -25,6 +28,7 @@ class _Actions(IntEnum):
     DISPLAY_ALL_BOOKS = auto()
     DISPLAY_ALL_LOANS = auto()
     DISPLAY_ALL_LATE_LOANS = auto()
+    DISPLAY_METRICS = auto()
     EXIT_PROGRAM = auto()
 
     def get_description(self) -> str:
@@ -43,16 +47,28 @@ class _Actions(IntEnum):
             "Display all books",
             "Display all loans",
             "Display all late loans",
+            "Display operation metrics",
             "Exit Program"
         )
 
         return actions_desc[self.value - 1]
 
 class LibraryApp:
-    def __init__(self, library_name: str, file_database: str) -> None:
+    AUTOSAVE_INTERVAL: float = 30.0
+    AUTOSAVE_MUTATIONS: int = 20
+    REPORT_PAGE_SIZE: int = 50
+    REPORT_TABULAR: bool = True
+
+    def __init__(self, library_name: str, file_database: str, collect_metrics: bool = False) -> None:
         self.__library_name: str = library_name
-        self.__library: Library = Library(file_database)
+        self.__file_database: str = file_database
+        self.__library: Library = Library(file_database, autosave_interval=self.AUTOSAVE_INTERVAL,
+                                        autosave_mutations=self.AUTOSAVE_MUTATIONS,
+                                        collect_metrics=collect_metrics)
         self.__user_action = None
+        self.__report_renderer: ReportRenderer = ReportRenderer(
+            self.__library, tabular=self.REPORT_TABULAR,
+            page_size=self.REPORT_PAGE_SIZE, next_page=self.__ask_next_page)
 
     def run(self) -> None:
         while True:
@@ -68,6 +84,7 @@ class LibraryApp:
 
     def stop(self) -> None:
         self.__library.save()
+        self.__library.close()
         exit()
 
     def __print_start_message(self) -> None:
@@ -94,6 +111,10 @@ class LibraryApp:
 
             break
 
+    @staticmethod
+    def __ask_next_page() -> bool:
+        return input("> Press Enter for the next page or 'q' to stop: ").strip().lower() != "q"
+
     def __display_customer(self, customer_id: int) -> None:
         customer = None
 
@@ -281,36 +302,36 @@ class LibraryApp:
                 print("\n... Find book by name")
 
                 book_name: str = get_input_from_user_str("book name")
-                books = self.__library.get_books_by_name(book_name)
-                books_count: int = len(books)
+                books_count: int = 0
 
                 print(f"... Searching for books with name '{book_name}'")
 
+                for book in self.__library.iter_books_by_name(book_name):
+                    self.__display_book(book.get_id())
+                    books_count += 1
+
                 if not books_count:
                     print(f"[X] There are no books with name '{book_name}'")
 
                 print(f"[V] Found {books_count} book(s) with name '{book_name}'")
 
-                for book in books:
-                    self.__display_book(book.get_id())
-
             case _Actions.BOOK_FIND_BY_AUTHOR:
                 print("\n... Find book by author")
 
                 book_author: str = get_input_from_user_str("book author")
-                books = self.__library.get_books_by_author(book_author)
-                books_count: int = len(books)
+                books_count: int = 0
 
                 print(f"... Searching for books with author '{book_author}'")
 
+                for book in self.__library.iter_books_by_author(book_author):
+                    self.__display_book(book.get_id())
+                    books_count += 1
+
                 if not books_count:
                     print(f"[X] There are no books with author '{book_author}'")
 
                 print(f"[V] Found {books_count} book(s) with author '{book_author}'")
 
-                for book in books:
-                    self.__display_book(book.get_id())
-
             case _Actions.BOOK_LOAN:
                 print("\n... Loan a book")
 
@@ -401,37 +422,37 @@ class LibraryApp:
                     break
 
             case _Actions.DISPLAY_ALL_CUSTOMERS:
-                all_customers = self.__library.get_all_customers()
+                with self.__library.scan_customers() as all_customers:
+                    first_customer = next(all_customers, None)
 
-                if not len(all_customers):
-                    print("... There are no customers in the library.")
-                else:
-                    print("\n... Displaying all customers")
+                    if first_customer is None:
+                        print("... There are no customers in the library.")
+                    else:
+                        print("\n... Displaying all customers")
 
-                    for customer in all_customers:
-                        self.__display_customer(customer.get_id())
+                        self.__report_renderer.render_customers(itertools.chain((first_customer,), all_customers))
 
             case _Actions.DISPLAY_ALL_BOOKS:
-                all_books = self.__library.get_all_books()
+                with self.__library.scan_books() as all_books:
+                    first_book = next(all_books, None)
 
-                if not len(all_books):
-                    print("... There are no books in the library.")
-                else:
-                    print("\n... Displaying all books")
+                    if first_book is None:
+                        print("... There are no books in the library.")
+                    else:
+                        print("\n... Displaying all books")
 
-                    for book in all_books:
-                        self.__display_book(book.get_id())
+                        self.__report_renderer.render_books(itertools.chain((first_book,), all_books))
 
             case _Actions.DISPLAY_ALL_LOANS:
-                all_loans = self.__library.get_all_loans()
+                with self.__library.scan_loans() as all_loans:
+                    first_loan = next(all_loans, None)
 
-                if not len(all_loans):
-                    print("... There are no loans in the library.")
-                else:
-                    print("\n... Displaying all loans")
+                    if first_loan is None:
+                        print("... There are no loans in the library.")
+                    else:
+                        print("\n... Displaying all loans")
 
-                    for loan in all_loans:
-                        self.__display_loan(loan.get_book_id())
+                        self.__report_renderer.render_loans(itertools.chain((first_loan,), all_loans))
 
             case _Actions.DISPLAY_ALL_LATE_LOANS:
                 all_late_loans = self.__library.get_all_late_loans()
@@ -441,7 +462,25 @@ class LibraryApp:
                 else:
                     print("\n... Displaying all late loans")
 
-                    for loan in all_late_loans:
-                        self.__display_loan(loan.get_book_id())
+                    self.__report_renderer.render_loans(all_late_loans)
                 
-                
\ No newline at end of file
+                
+
+            case _Actions.DISPLAY_METRICS:
+                metrics = self.__library.get_metrics()
+
+                if metrics is None:
+                    print("... Operation metrics are not enabled.")
+                else:
+                    print("\n... Displaying operation metrics")
+                    print(metrics.get_report())
+
+                    metrics_file: str = f"{self.__file_database}.metrics.json"
+
+                    try:
+                        with open(metrics_file, "w", encoding="utf-8") as file_handler:
+                            json.dump(metrics.to_dict(), file_handler, indent=2)
+
+                        print(f"[V] Metrics written to '{metrics_file}'.")
+                    except OSError as error:
+                        print(error)
@@ -0,0 +1,149 @@
+import re
+import json
+import datetime
+from typing import Any, Callable, Iterable, TextIO
+from api_library.library import Library
+from api_library.bulk_import import parse_date, parse_book_type
+from api_library.serialization import to_json_value
+from api_library.exceptions import LibraryException
+from app_library.app_library import _Actions
+
+class _CommandException(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+class LibraryBatch:
+    # name=value or name="value with \"escaped\" quotes".
+    PARAM_PATTERN: re.Pattern = re.compile(r'\s*([^\s=]+)=(?:"((?:[^"\\]|\\.)*)"|(\S*))')
+    ESCAPE_PATTERN: re.Pattern = re.compile(r'\\(.)')
+
+    PARAM_PARSERS: dict[str, Callable[[Any], Any]] = {
+        "customer_id": int,
+        "book_id": int,
+        "birth_date": parse_date,
+        "date_published": parse_date,
+        "loan_date": parse_date,
+        "return_date": parse_date,
+        "book_type": parse_book_type
+    }
+
+    def __init__(self, library: Library) -> None:
+        self.__library: Library = library
+
+        self.__commands: dict[_Actions, Callable[..., Any]] = {
+            _Actions.CUSTOMER_ADD: library.add_customer,
+            _Actions.CUSTOMER_FIND_BY_NAME: library.get_customer_by_name,
+            _Actions.CUSTOMER_DISPLAY_LOANS: library.get_customer_loans,
+            _Actions.CUSTOMER_DELETE: library.remove_customer,
+            _Actions.BOOK_ADD: library.add_book,
+            _Actions.BOOK_FIND_BY_NAME: library.iter_books_by_name,
+            _Actions.BOOK_FIND_BY_AUTHOR: library.iter_books_by_author,
+            _Actions.BOOK_LOAN: self.__loan_book,
+            _Actions.BOOK_RETURN: library.return_book,
+            _Actions.BOOK_DELETE: library.remove_book,
+            _Actions.DISPLAY_ALL_CUSTOMERS: library.iter_customers,
+            _Actions.DISPLAY_ALL_BOOKS: library.iter_books,
+            _Actions.DISPLAY_ALL_LOANS: library.iter_loans,
+            _Actions.DISPLAY_ALL_LATE_LOANS: library.get_all_late_loans,
+            _Actions.DISPLAY_METRICS: self.__get_metrics
+        }
+
+    def __loan_book(self, customer_id: int, book_id: int, return_date: datetime.date,
+                    loan_date: datetime.date | None = None) -> None:
+
+        # Starts today, a date like the parsed return date so the two can be compared.
+        if loan_date is None:
+            loan_date = datetime.date.today()
+
+        self.__library.loan_book(customer_id, book_id, loan_date, return_date)
+
+    def __get_metrics(self) -> dict | None:
+        metrics = self.__library.get_metrics()
+
+        return None if metrics is None else metrics.to_dict()
+
+    @staticmethod
+    def __get_action(value: Any) -> _Actions:
+        try:
+            if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+                return _Actions(int(value))
+
+            return _Actions[str(value).upper()]
+        except (KeyError, ValueError):
+            raise _CommandException(f"Unknown action '{value}'.")
+
+    @classmethod
+    def parse_command(cls, line: str) -> tuple[_Actions, dict[str, Any]]:
+        # A JSON object, or the compact form: ACTION name=value name="quoted value" ...
+        if line.lstrip().startswith("{"):
+            try:
+                command: Any = json.loads(line)
+            except ValueError as error:
+                raise _CommandException(f"Invalid JSON command ({error}).")
+
+            params: Any = command.get("params", dict())
+
+            if not isinstance(params, dict):
+                raise _CommandException("Command params must be a JSON object.")
+
+            return cls.__get_action(command.get("action")), params
+
+        action, rest = (line.split(None, 1) + [""])[:2]
+        params: dict[str, Any] = dict()
+        position: int = 0
+        rest = rest.strip()
+
+        while position < len(rest):
+            match: re.Match | None = cls.PARAM_PATTERN.match(rest, position)
+
+            if match is None:
+                raise _CommandException(f"Invalid parameter '{rest[position:].split()[0]}', expected name=value.")
+
+            name, quoted_value, value = match.groups()
+            params[name] = value if quoted_value is None else cls.ESCAPE_PATTERN.sub(r"\1", quoted_value)
+            position = match.end()
+
+        return cls.__get_action(action), params
+
+    def execute(self, action: _Actions, params: dict[str, Any]) -> Any:
+        try:
+            parsed_params: dict[str, Any] = {
+                name: self.PARAM_PARSERS[name](value) if name in self.PARAM_PARSERS else value
+                for name, value in params.items()
+            }
+        except (KeyError, TypeError, ValueError) as error:
+            raise _CommandException(f"Invalid parameter value ({error!r}).")
+
+        try:
+            return to_json_value(self.__commands[action](**parsed_params))
+        except TypeError as error:
+            raise _CommandException(str(error))
+
+    def run(self, lines: Iterable[str], output: TextIO) -> int:
+        errors_count: int = 0
+
+        try:
+            for line_number, line in enumerate(lines, 1):
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+
+                response: dict[str, Any] = {"line": line_number}
+
+                try:
+                    action, params = self.parse_command(line)
+                    response["action"] = action.name
+
+                    if action == _Actions.EXIT_PROGRAM:
+                        output.write(json.dumps(response) + "\n")
+                        break
+
+                    response["result"] = self.execute(action, params)
+                except (LibraryException, _CommandException) as error:
+                    response["error"] = {"type": type(error).__name__.lstrip("_"), "message": str(error)}
+                    errors_count += 1
+
+                output.write(json.dumps(response) + "\n")
+        finally:
+            self.__library.save()
+
+        return errors_count
@@ -0,0 +1,237 @@
+import json
+import asyncio
+import concurrent.futures
+from typing import Any, Callable
+from api_library.library import Library
+from api_library.bulk_import import parse_date, parse_book_type
+from api_library.serialization import to_json_value
+from api_library.exceptions import LibraryException
+
+class _ProtocolException(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+class LibraryServer:
+    LIBRARY_METHODS: frozenset[str] = frozenset((
+        "get_customer_by_id",
+        "get_customer_by_name",
+        "get_customer_loans",
+        "iter_customers",
+        "get_book_by_id",
+        "get_books_by_name",
+        "get_books_by_author",
+        "iter_books",
+        "iter_books_by_name",
+        "iter_books_by_author",
+        "search_books",
+        "is_book_loaned",
+        "get_loan",
+        "iter_loans",
+        "get_all_late_loans",
+        "get_loans_due_between",
+        "get_loan_history",
+        "add_customer",
+        "remove_customer",
+        "add_book",
+        "remove_book",
+        "loan_book",
+        "return_book",
+        "reserve_book",
+        "cancel_reservation",
+        "get_book_reservations",
+        "get_customer_reservations",
+        "expire_reservations"
+    ))
+
+    PERSISTENCE_METHODS: frozenset[str] = frozenset((
+        "save",
+        "compact"
+    ))
+
+    PARAM_PARSERS: dict[str, Callable[[Any], Any]] = {
+        "birth_date": parse_date,
+        "date_published": parse_date,
+        "loan_date": parse_date,
+        "return_date": parse_date,
+        "as_of": parse_date,
+        "start_date": parse_date,
+        "end_date": parse_date,
+        "expiration_date": parse_date,
+        "book_type": parse_book_type
+    }
+
+    def __init__(self, library: Library, host: str = "127.0.0.1", port: int = 8765,
+                query_workers: int = 4, max_pipelined_requests: int = 64) -> None:
+
+        if not library.is_thread_safe():
+            raise LibraryException("Library server requires a thread safe library.")
+
+        self.__library: Library = library
+        self.__host: str = host
+        self.__port: int = port
+        self.__max_pipelined_requests: int = max_pipelined_requests
+        self.__query_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=query_workers, thread_name_prefix="library-query")
+        self.__persistence_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="library-persistence")
+        self.__server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self.__server = await asyncio.start_server(self.__handle_connection, self.__host, self.__port)
+
+    def get_port(self) -> int:
+        return self.__server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self.__server is None:
+            await self.start()
+
+        try:
+            async with self.__server:
+                await self.__server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.__persistence_executor, self.__library.save)
+
+        self.__query_executor.shutdown()
+        self.__persistence_executor.shutdown()
+
+    def __execute(self, method: str, params: dict[str, Any]) -> Any:
+        parsed_params: dict[str, Any] = {
+            name: self.PARAM_PARSERS[name](value) if name in self.PARAM_PARSERS and value is not None else value
+            for name, value in params.items()
+        }
+
+        return to_json_value(getattr(self.__library, method)(**parsed_params))
+
+    def __submit(self, request: Any) -> asyncio.Future:
+        if not isinstance(request, dict):
+            raise _ProtocolException("Request must be a JSON object.")
+
+        method: Any = request.get("method")
+        params: Any = request.get("params", dict())
+
+        if not isinstance(params, dict):
+            raise _ProtocolException("Request params must be a JSON object.")
+
+        if method in self.LIBRARY_METHODS:
+            executor = self.__query_executor
+        elif method in self.PERSISTENCE_METHODS:
+            executor = self.__persistence_executor
+        else:
+            raise _ProtocolException(f"Unknown method '{method}'.")
+
+        return asyncio.get_running_loop().run_in_executor(executor, self.__execute, method, params)
+
+    @staticmethod
+    def __get_error(error: Exception) -> dict[str, str]:
+        if isinstance(error, (LibraryException, _ProtocolException)):
+            error_type: str = type(error).__name__.lstrip("_")
+        elif isinstance(error, (TypeError, ValueError, KeyError)):
+            error_type = "ProtocolException"
+        else:
+            error_type = "ServerException"
+
+        return {"type": error_type, "message": str(error)}
+
+    async def __process_requests(self, writer: asyncio.StreamWriter,
+                                requests: asyncio.Queue) -> None:
+
+        # The pool runs different connections in parallel, one connection's requests run one at a time.
+        while True:
+            item: tuple[Any, Any] | None = await requests.get()
+
+            if item is None:
+                break
+
+            request_id, request = item
+            response: dict[str, Any] = {"id": request_id}
+
+            try:
+                if isinstance(request, Exception):
+                    raise request
+
+                response["result"] = await self.__submit(request)
+            except Exception as error:
+                response["error"] = self.__get_error(error)
+
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    @staticmethod
+    async def __read_line(reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            return error.partial
+        except asyncio.LimitOverrunError as error:
+            overrun_size: int = error.consumed
+
+        # An overlong line is skipped up to its end, the connection stays usable.
+        while True:
+            await reader.readexactly(overrun_size)
+
+            try:
+                await reader.readuntil(b"\n")
+                break
+            except asyncio.IncompleteReadError:
+                break
+            except asyncio.LimitOverrunError as error:
+                overrun_size = error.consumed
+
+        raise _ProtocolException("Request line is too long.")
+
+    async def __handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+
+        # Requests are read ahead while earlier ones run, and answered in the order they came in.
+        requests: asyncio.Queue = asyncio.Queue(maxsize=self.__max_pipelined_requests)
+        processor_task: asyncio.Task = asyncio.create_task(self.__process_requests(writer, requests))
+
+        try:
+            while not processor_task.done():
+                try:
+                    line: bytes = await self.__read_line(reader)
+                except _ProtocolException as error:
+                    await requests.put((None, error))
+                    continue
+
+                if not line:
+                    break
+
+                if not line.strip():
+                    continue
+
+                request_id: Any = None
+
+                try:
+                    request: Any = json.loads(line)
+                    request_id = request.get("id") if isinstance(request, dict) else None
+                except ValueError as error:
+                    request = error
+
+                await requests.put((request_id, request))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if not processor_task.done():
+                await requests.put(None)
+
+            try:
+                await processor_task
+            except ConnectionError:
+                pass
+
+            writer.close()
+
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
@@ -0,0 +1,163 @@
+import sys
+import datetime
+import itertools
+from typing import Callable, Iterable, Iterator, TextIO
+from api_library.library import Library
+from api_library.customer import Customer
+from api_library.book.book import Book
+from api_library.loan import Loan
+from api_library.query import In
+
+class ReportRenderer:
+    BATCH_SIZE: int = 1000
+    DATE_FORMAT: str = "%d.%m.%Y"
+
+    def __init__(self, library: Library, output: TextIO = sys.stdout, tabular: bool = False,
+                page_size: int | None = None, next_page: Callable[[], bool] | None = None) -> None:
+
+        self.__library: Library = library
+        self.__output: TextIO = output
+        self.__tabular: bool = tabular
+        self.__page_size: int | None = page_size
+        self.__next_page: Callable[[], bool] | None = next_page
+        self.__formatted_dates: dict[datetime.date, str] = dict()
+
+    def __format_date(self, date: datetime.date) -> str:
+        # Listings repeat a small set of dates, strftime is the costliest part of a row.
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+
+        formatted_date: str | None = self.__formatted_dates.get(date)
+
+        if formatted_date is None:
+            formatted_date = self.__formatted_dates[date] = date.strftime(self.DATE_FORMAT)
+
+        return formatted_date
+
+    @staticmethod
+    def __cell(value: object, width: int) -> str:
+        text: str = str(value)
+
+        if len(text) > width:
+            text = text[:width - 1] + "~"
+
+        return text.ljust(width)
+
+    def __row(self, *cells: tuple[object, int]) -> str:
+        return " | ".join(self.__cell(value, width) for value, width in cells).rstrip() + "\n"
+
+    def __render(self, items: Iterable, format_item: Callable[[object], str], header: str | None) -> int:
+        # Rows are formatted into a batch and written with one call, pages end a batch early.
+        rendered_count: int = 0
+        batch: list[str] = list()
+
+        if self.__tabular and header is not None:
+            batch.append(header)
+            batch.append("-" * (len(header) - 1) + "\n")
+
+        for item in items:
+            batch.append(format_item(item))
+            rendered_count += 1
+
+            is_page_end: bool = self.__page_size is not None and not rendered_count % self.__page_size
+
+            if len(batch) >= self.BATCH_SIZE or is_page_end:
+                self.__output.write("".join(batch))
+                batch.clear()
+
+            if is_page_end:
+                self.__output.flush()
+
+                if self.__next_page is not None and not self.__next_page():
+                    return rendered_count
+
+        if batch:
+            self.__output.write("".join(batch))
+
+        self.__output.flush()
+
+        return rendered_count
+
+    def __format_customer(self, customer: Customer) -> str:
+        if self.__tabular:
+            return self.__row((customer.get_id(), 8), (customer.get_name(), 24), (customer.get_email(), 28),
+                            (self.__format_date(customer.get_birth_date()), 10), (customer.get_address(), 30))
+
+        return f"""
+            - Customer (ID: {customer.get_id()})
+                > Name: {customer.get_name()}
+                > Address: {customer.get_address()}
+                > Email: {customer.get_email()}
+                > Birth date: {self.__format_date(customer.get_birth_date())}
+        \n"""
+
+    def render_customers(self, customers: Iterable[Customer]) -> int:
+        header: str = self.__row(("ID", 8), ("Name", 24), ("Email", 28), ("Birth date", 10), ("Address", 30))
+
+        return self.__render(customers, self.__format_customer, header)
+
+    def __format_book(self, book: Book) -> str:
+        if self.__tabular:
+            return self.__row((book.get_id(), 8), (book.get_name(), 32), (book.get_author(), 24),
+                            (self.__format_date(book.get_date_published()), 10),
+                            (f"{book.get_max_loan_time().days} day(s)", 10))
+
+        return f"""
+                - Book (ID: {book.get_id()})
+                    > Name: {book.get_name()}
+                    > Author: {book.get_author()}
+                    > Publish date: {self.__format_date(book.get_date_published())}
+                    > Max loan time: {str(book.get_max_loan_time().days)} day(s)
+            \n"""
+
+    def render_books(self, books: Iterable[Book]) -> int:
+        header: str = self.__row(("ID", 8), ("Name", 32), ("Author", 24), ("Published", 10), ("Max loan", 10))
+
+        return self.__render(books, self.__format_book, header)
+
+    def __join_loans(self, loans: Iterable[Loan]) -> Iterator[tuple[Loan, Customer, Book | None]]:
+        # Customers usually hold several loans, so each one is fetched once for the whole report.
+        customers: dict[int, Customer] = dict()
+        temp_loans: Iterator[Loan] = iter(loans)
+        # Books are fetched with one query per batch, a batch is never longer than a page.
+        batch_size: int = min(self.BATCH_SIZE, self.__page_size or self.BATCH_SIZE)
+
+        while True:
+            batch: tuple[Loan] = tuple(itertools.islice(temp_loans, batch_size))
+
+            if not batch:
+                return
+
+            books: dict[int, Book] = dict()
+
+            if self.__tabular:
+                books = {i.get_id(): i for i in self.__library.query_books(In("id", (j.get_book_id() for j in batch)))}
+
+            for loan in batch:
+                customer: Customer | None = customers.get(loan.get_customer_id())
+
+                if customer is None:
+                    customer = customers[loan.get_customer_id()] = self.__library.get_customer_by_id(loan.get_customer_id())
+
+                yield loan, customer, books.get(loan.get_book_id())
+
+    def __format_loan(self, joined_loan: tuple[Loan, Customer, Book | None]) -> str:
+        loan, customer, book = joined_loan
+
+        if self.__tabular:
+            return self.__row((loan.get_book_id(), 8), (book.get_name(), 32),
+                            (f"{customer.get_name()} ({customer.get_id()})", 32),
+                            (self.__format_date(loan.get_loan_date()), 10),
+                            (self.__format_date(loan.get_return_date()), 10))
+
+        return f"""
+                - Loan (Book ID: {loan.get_book_id()})
+                    > Loaned to: {customer.get_name()} (ID: {customer.get_id()})
+                    > Loan date: {self.__format_date(loan.get_loan_date())}
+                    > Return date: {self.__format_date(loan.get_return_date())}
+            \n"""
+
+    def render_loans(self, loans: Iterable[Loan]) -> int:
+        header: str = self.__row(("Book ID", 8), ("Book", 32), ("Loaned to", 32), ("Loan date", 10), ("Return", 10))
+
+        return self.__render(self.__join_loans(loans), self.__format_loan, header)
@@ -0,0 +1,31 @@
+import sys
+import argparse
+from api_library.library import Library
+from app_library.library_batch import LibraryBatch
+
+def main():
+    parser = argparse.ArgumentParser(description="Run library commands from a JSONL or line command file.")
+    parser.add_argument("file_database")
+    parser.add_argument("commands", nargs="?", default="-", help="command file (standard input by default)")
+    parser.add_argument("--output", default="-", help="results file (standard output by default)")
+    arguments = parser.parse_args()
+
+    library: Library = Library(arguments.file_database)
+    commands = sys.stdin if arguments.commands == "-" else open(arguments.commands, "r", encoding="utf-8")
+    output = sys.stdout if arguments.output == "-" else open(arguments.output, "w", encoding="utf-8")
+
+    try:
+        errors_count: int = LibraryBatch(library).run(commands, output)
+    finally:
+        library.close()
+
+        if commands is not sys.stdin:
+            commands.close()
+
+        if output is not sys.stdout:
+            output.close()
+
+    sys.exit(1 if errors_count else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import sys
+import json
+import argparse
+import platform
+import datetime
+import tempfile
+import subprocess
+from api_library.storage.storage_type import StorageType
+from benchmark_library.benchmark_runner import BenchmarkRunner
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every Library operation on seeded synthetic libraries.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="number of books per library, with a fifth as many customers and a tenth as many loans")
+    parser.add_argument("--storage", choices=[i.name.lower() for i in StorageType], default="pickle")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--heavy-iterations", type=int, default=3)
+    parser.add_argument("--directory", default=None, help="where the libraries are written (a temporary directory by default)")
+    parser.add_argument("--output", default=None, help="JSON report path (standard output by default)")
+    arguments = parser.parse_args()
+
+    storage_type: StorageType = StorageType[arguments.storage.upper()]
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        runner: BenchmarkRunner = BenchmarkRunner(arguments.directory or temp_directory, storage_type,
+                                                arguments.seed, arguments.iterations, arguments.heavy_iterations)
+
+        report: dict = {
+            "meta": {
+                "commit": get_commit(),
+                "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "storage": arguments.storage,
+                "seed": arguments.seed
+            },
+            "scales": [runner.run(i) for i in arguments.scales]
+        }
+
+    if arguments.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(arguments.output, "w", encoding="utf-8") as file_handler:
+            json.dump(report, file_handler, indent=2)
+
+if __name__ == "__main__":
+    main()
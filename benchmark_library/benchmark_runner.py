@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import random
+import datetime
+import tracemalloc
+from typing import Any, Callable
+from api_library.library import Library
+from api_library.loan_batch import LoanBatch
+from api_library.book.book_type import BookType
+from api_library.storage.storage_type import StorageType
+from benchmark_library.synthetic_data import REFERENCE_DATE, SyntheticLibrary
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class BenchmarkResult:
+    def __init__(self, operation: str, latencies_ns: list[int],
+                peak_memory_bytes: int | None) -> None:
+
+        self.__operation: str = operation
+        self.__latencies_ns: list[int] = sorted(latencies_ns)
+        self.__peak_memory_bytes: int | None = peak_memory_bytes
+
+    def get_operation(self) -> str:
+        return self.__operation
+
+    def __get_percentile_ms(self, percentile: float) -> float:
+        # Nearest rank, so small samples report a latency that was actually measured.
+        rank: int = max(0, min(len(self.__latencies_ns) - 1,
+                            round(percentile * len(self.__latencies_ns)) - 1))
+
+        return self.__latencies_ns[rank] / 1_000_000
+
+    def to_dict(self) -> dict[str, Any]:
+        total_ns: int = sum(self.__latencies_ns)
+
+        return {
+            "operation": self.__operation,
+            "iterations": len(self.__latencies_ns),
+            "throughput_per_second": len(self.__latencies_ns) * 1_000_000_000 / total_ns if total_ns else None,
+            "p50_ms": self.__get_percentile_ms(0.50),
+            "p99_ms": self.__get_percentile_ms(0.99),
+            "total_ms": total_ns / 1_000_000,
+            "peak_memory_bytes": self.__peak_memory_bytes
+        }
+
+class BenchmarkRunner:
+    PAGE_SIZE: int = 50
+    BATCH_SIZE: int = 10
+
+    def __init__(self, directory: str, storage_type: StorageType = StorageType.PICKLE,
+                seed: int = 0, iterations: int = 200, heavy_iterations: int = 3) -> None:
+
+        self.__directory: str = directory
+        self.__storage_type: StorageType = storage_type
+        self.__seed: int = seed
+        self.__iterations: int = iterations
+        self.__heavy_iterations: int = heavy_iterations
+
+    @staticmethod
+    def __get_peak_rss_bytes() -> int | None:
+        if resource is None:
+            return None
+
+        # Linux reports kilobytes, macOS reports bytes.
+        peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+    @staticmethod
+    def __log(message: str) -> None:
+        print(message, file=sys.stderr, flush=True)
+
+    def __measure(self, operation: str, iterations: int, call: Callable[[int], Any]) -> BenchmarkResult:
+        # The traced call doubles as the warmup, the timed calls run untraced.
+        tracemalloc.start()
+
+        try:
+            call(0)
+            peak_memory_bytes: int = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        latencies_ns: list[int] = list()
+
+        for i in range(1, iterations + 1):
+            start_ns: int = time.perf_counter_ns()
+            call(i)
+            latencies_ns.append(time.perf_counter_ns() - start_ns)
+
+        self.__log(f"  {operation}: {sorted(latencies_ns)[len(latencies_ns) // 2] / 1_000_000:.3f} ms")
+
+        return BenchmarkResult(operation, latencies_ns, peak_memory_bytes)
+
+    def __measure_once(self, operation: str, call: Callable[[], Any]) -> BenchmarkResult:
+        start_ns: int = time.perf_counter_ns()
+        call()
+        elapsed_ns: int = time.perf_counter_ns() - start_ns
+
+        self.__log(f"  {operation}: {elapsed_ns / 1_000_000:.3f} ms")
+
+        return BenchmarkResult(operation, [elapsed_ns], None)
+
+    def __remove_files(self, file_database: str) -> None:
+        prefix: str = f"{os.path.basename(file_database)}."
+
+        for file_name in os.listdir(self.__directory):
+            if file_name.startswith(prefix):
+                os.remove(os.path.join(self.__directory, file_name))
+
+    def run(self, scale: int) -> dict[str, Any]:
+        synthetic_library: SyntheticLibrary = SyntheticLibrary(scale, self.__seed)
+        file_database: str = os.path.join(self.__directory, f"benchmark_{self.__storage_type.name.lower()}_{scale}")
+        rng: random.Random = random.Random(self.__seed)
+        results: list[BenchmarkResult] = list()
+
+        self.__log(f"Scale {scale}:")
+        self.__remove_files(file_database)
+
+        library: Library = Library(file_database, storage_type=self.__storage_type)
+
+        results.append(self.__measure_once("import_customers",
+                        lambda: library.import_customers(synthetic_library.iter_customer_rows())))
+        results.append(self.__measure_once("import_books",
+                        lambda: library.import_books(synthetic_library.iter_book_rows())))
+        results.append(self.__measure_once("import_loans",
+                        lambda: library.import_loans(synthetic_library.iter_loan_rows())))
+
+        customers_count: int = synthetic_library.get_customers_count()
+        books_count: int = synthetic_library.get_books_count()
+        samples_count: int = max(self.__iterations, self.__heavy_iterations) + 1
+
+        # Every lookup key is drawn before the clock starts.
+        customer_ids: list[int] = [rng.randrange(customers_count) for _ in range(samples_count)]
+        book_ids: list[int] = [rng.randrange(books_count) for _ in range(samples_count)]
+        customer_names: list[str] = [synthetic_library.get_customer_name(i) for i in customer_ids]
+        books = [library.get_book_by_id(i) for i in book_ids]
+        loaned_book_ids: list[int] = [i.get_book_id() for i in library.iter_loans(limit=samples_count)]
+        free_book_ids: list[int] = [i for i in range(books_count) if not library.is_book_loaned(i)]
+        search_queries: list[str] = [i.get_name().split()[0][:rng.randint(3, 6)] for i in books]
+
+        def get_offset(count: int) -> int:
+            return rng.randrange(max(1, count - self.PAGE_SIZE))
+
+        reads: tuple[tuple[str, Callable[[int], Any]]] = (
+            ("get_customer_by_id", lambda i: library.get_customer_by_id(customer_ids[i])),
+            ("get_customer_by_name", lambda i: library.get_customer_by_name(customer_names[i])),
+            ("get_customer_loans", lambda i: library.get_customer_loans(customer_ids[i])),
+            ("iter_customers", lambda i: list(library.iter_customers(get_offset(customers_count), self.PAGE_SIZE))),
+            ("get_book_by_id", lambda i: library.get_book_by_id(book_ids[i])),
+            ("get_books_by_name", lambda i: library.get_books_by_name(books[i].get_name())),
+            ("get_books_by_author", lambda i: library.get_books_by_author(books[i].get_author())),
+            ("iter_books", lambda i: list(library.iter_books(get_offset(books_count), self.PAGE_SIZE))),
+            ("search_books", lambda i: library.search_books(search_queries[i])),
+            ("is_book_loaned", lambda i: library.is_book_loaned(book_ids[i])),
+            ("get_loan", lambda i: library.get_loan(loaned_book_ids[i % len(loaned_book_ids)])),
+            ("iter_loans", lambda i: list(library.iter_loans(0, self.PAGE_SIZE)))
+        )
+
+        heavy_reads: tuple[tuple[str, Callable[[int], Any]]] = (
+            ("get_all_customers", lambda i: library.get_all_customers()),
+            ("get_all_books", lambda i: library.get_all_books()),
+            ("get_all_loans", lambda i: library.get_all_loans()),
+            ("get_all_late_loans", lambda i: library.get_all_late_loans(REFERENCE_DATE)),
+            ("get_loans_due_between", lambda i: library.get_loans_due_between(
+                REFERENCE_DATE - datetime.timedelta(days=7), REFERENCE_DATE))
+        )
+
+        for operation, call in reads:
+            results.append(self.__measure(operation, self.__iterations, call))
+
+        for operation, call in heavy_reads:
+            results.append(self.__measure(operation, self.__heavy_iterations, call))
+
+        new_customers_start: int = customers_count
+        new_books_start: int = books_count
+        batch_book_ids: list[int] = free_book_ids[self.__iterations + 1:]
+
+        def loan_batch(i: int) -> None:
+            batch: LoanBatch = LoanBatch()
+
+            for book_id in batch_book_ids[i * self.BATCH_SIZE:(i + 1) * self.BATCH_SIZE]:
+                batch.loan_book(customer_ids[i], book_id, REFERENCE_DATE, REFERENCE_DATE)
+
+            library.apply_loan_batch(batch)
+
+        writes: tuple[tuple[str, int, Callable[[int], Any]]] = (
+            ("add_customer", self.__iterations, lambda i: library.add_customer(
+                new_customers_start + i, f"New Customer {i}", "Address", "new@example.com", REFERENCE_DATE)),
+            ("add_book", self.__iterations, lambda i: library.add_book(
+                new_books_start + i, BookType.BASIC, f"New Book {i}", "New Author", REFERENCE_DATE)),
+            ("loan_book", self.__iterations, lambda i: library.loan_book(
+                customer_ids[i], free_book_ids[i], REFERENCE_DATE, REFERENCE_DATE)),
+            ("return_book", self.__iterations, lambda i: library.return_book(free_book_ids[i])),
+            ("apply_loan_batch", min(self.__heavy_iterations, len(batch_book_ids) // self.BATCH_SIZE - 1), loan_batch),
+            ("remove_book", self.__iterations, lambda i: library.remove_book(new_books_start + i)),
+            ("remove_customer", self.__iterations, lambda i: library.remove_customer(i))
+        )
+
+        # The traced call consumes the first key of every mutation, so none is repeated.
+        for operation, iterations, call in writes:
+            results.append(self.__measure(operation, iterations, call))
+
+        results.append(self.__measure("save", self.__heavy_iterations, lambda i: library.save()))
+        results.append(self.__measure("compact", self.__heavy_iterations, lambda i: library.compact()))
+
+        library.close()
+
+        def open_library(i: int) -> None:
+            Library(file_database, storage_type=self.__storage_type).close()
+
+        results.append(self.__measure("startup", self.__heavy_iterations, open_library))
+        self.__remove_files(file_database)
+
+        return {
+            "scale": scale,
+            "customers": customers_count,
+            "books": books_count,
+            "loans": synthetic_library.get_loans_count(),
+            "peak_rss_bytes": self.__get_peak_rss_bytes(),
+            "results": [i.to_dict() for i in results]
+        }
@@ -0,0 +1,97 @@
+import random
+import datetime
+from typing import Any, Iterator
+from api_library.book.book_type import BookType
+
+REFERENCE_DATE: datetime.date = datetime.date(2024, 1, 1)
+
+_SYLLABLES: tuple[str] = (
+    "ka", "ri", "mo", "ten", "sa", "lu", "vi", "dor", "el", "na",
+    "ba", "ro", "shi", "mar", "to", "li", "gan", "ze", "fa", "un"
+)
+
+_WORDS: tuple[str] = (
+    "river", "shadow", "garden", "empire", "winter", "silent", "glass", "kingdom",
+    "ocean", "secret", "fire", "stone", "night", "journey", "golden", "storm",
+    "forest", "memory", "city", "star", "crown", "letter", "island", "mirror"
+)
+
+class SyntheticLibrary:
+    def __init__(self, scale: int, seed: int = 0) -> None:
+        self.__seed: int = seed
+        self.__books_count: int = scale
+        self.__customers_count: int = max(1, scale // 5)
+        self.__loans_count: int = min(scale // 10, self.__books_count)
+        self.__authors_count: int = max(1, scale // 20)
+
+    def get_books_count(self) -> int:
+        return self.__books_count
+
+    def get_customers_count(self) -> int:
+        return self.__customers_count
+
+    def get_loans_count(self) -> int:
+        return self.__loans_count
+
+    def __get_random(self, stream: int) -> random.Random:
+        # Every entity kind has its own stream, so the rows do not depend on the generation order.
+        return random.Random(self.__seed * 31 + stream)
+
+    @staticmethod
+    def __make_name(rng: random.Random, syllables_count: int) -> str:
+        return "".join(rng.choice(_SYLLABLES) for _ in range(syllables_count)).capitalize()
+
+    def get_customer_name(self, customer_id: int) -> str:
+        rng: random.Random = random.Random(self.__seed * 1_000_003 + customer_id)
+
+        return f"{self.__make_name(rng, 2)} {self.__make_name(rng, 3)}"
+
+    def get_author_name(self, author_number: int) -> str:
+        rng: random.Random = random.Random(self.__seed * 2_000_003 + author_number)
+
+        return f"{self.__make_name(rng, 2)} {self.__make_name(rng, 3)}"
+
+    def iter_customer_rows(self) -> Iterator[dict[str, Any]]:
+        rng: random.Random = self.__get_random(1)
+
+        for customer_id in range(self.__customers_count):
+            yield {
+                "id": customer_id,
+                "name": self.get_customer_name(customer_id),
+                "address": f"{rng.randint(1, 200)} {rng.choice(_WORDS).capitalize()} St.",
+                "email": f"customer{customer_id}@example.com",
+                "birth_date": datetime.date(1940, 1, 1) + datetime.timedelta(days=rng.randrange(25_000))
+            }
+
+    def __get_book_types(self) -> list[BookType]:
+        rng: random.Random = self.__get_random(4)
+
+        return rng.choices(tuple(BookType), k=self.__books_count)
+
+    def iter_book_rows(self) -> Iterator[dict[str, Any]]:
+        rng: random.Random = self.__get_random(2)
+        authors: list[str] = [self.get_author_name(i) for i in range(self.__authors_count)]
+
+        for book_id, book_type in enumerate(self.__get_book_types()):
+            yield {
+                "id": book_id,
+                "type": book_type,
+                "name": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4))).title(),
+                "author": rng.choice(authors),
+                "date_published": datetime.date(1800, 1, 1) + datetime.timedelta(days=rng.randrange(80_000))
+            }
+
+    def iter_loan_rows(self) -> Iterator[dict[str, Any]]:
+        rng: random.Random = self.__get_random(3)
+        book_types: list[BookType] = self.__get_book_types()
+
+        for book_id in rng.sample(range(self.__books_count), self.__loans_count):
+            loan_date: datetime.date = REFERENCE_DATE - datetime.timedelta(days=rng.randrange(30))
+            max_days: int = book_types[book_id].get_max_loan_time().days
+
+            yield {
+                "customer_id": rng.randrange(self.__customers_count),
+                "book_id": book_id,
+                "loan_date": loan_date,
+                "return_date": loan_date + datetime.timedelta(days=rng.randint(0, max_days))
+            }
@@ -0,0 +1,28 @@
+import sys
+import argparse
+from api_library.storage.memory_engine import MemoryEngine
+from api_library.storage.storage_type import StorageType
+from api_library.exceptions import LibraryException
+
+def main():
+    snapshot_types: list[str] = [
+        i.name.lower() for i in StorageType if issubclass(i.get_engine_type(), MemoryEngine)
+    ]
+
+    parser = argparse.ArgumentParser(description="Convert a library snapshot file to another storage format.")
+    parser.add_argument("file_database")
+    parser.add_argument("--source", choices=snapshot_types, default="pickle")
+    parser.add_argument("--target", choices=snapshot_types, default="binary")
+    arguments = parser.parse_args()
+
+    source_type: type[MemoryEngine] = StorageType[arguments.source.upper()].get_engine_type()
+    target_type: type[MemoryEngine] = StorageType[arguments.target.upper()].get_engine_type()
+
+    try:
+        target_type.convert_snapshot(arguments.file_database, source_type)
+    except LibraryException as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import asyncio
+from api_library.library import Library
+from app_library.library_server import LibraryServer
+
+def main():
+    library: Library = Library("library_john_bryce", thread_safe=True)
+    library_server: LibraryServer = LibraryServer(library)
+
+    try:
+        asyncio.run(library_server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()